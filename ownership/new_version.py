@@ -1,12 +1,20 @@
 import csv
 import os
+import sys
 
 # Configuration
 CSV_FILE_PATH = 'grant_ownership_statements.csv'  # Path to your CSV file
-OUTPUT_DIR = 'ownership_transfer_scripts'         # Output directory
+OUTPUT_DIR = 'ownership_transfer_scripts'         # Output directory; None writes no files
 BATCH_SIZE = 100                                  # Number of statements per file
 FILE_PREFIX = 'V2025.04.16.0000.'                 # Fixed prefix for filenames
 
+# Pipeline mode: stream each batch straight into parity/execution.py's executor as soon
+# as it is read, so later batches are generated while earlier ones run. Files are still
+# written to OUTPUT_DIR, each before its batch runs, as an audit trail. Connection,
+# workers, journal (--resume) and failed query settings come from parity/execution.py;
+# batches are ordered around schema-wide grants as described in parity/grant_stages.py.
+EXECUTE = False
+
 def extract_table_name(grant_statement):
     """Extract table name from grant statement"""
     try:
@@ -17,7 +25,7 @@ def extract_table_name(grant_statement):
             parts = grant_statement.split("ON SEQUENCE")[1].split("TO ROLE")[0].strip()
         else:
             return "unknown"
-        
+
         # Remove schema if present and get just the table name
         if '.' in parts:
             return parts.split('.')[1].strip('"\'')
@@ -30,49 +38,71 @@ def create_output_directory():
     if not os.path.exists(OUTPUT_DIR):
         os.makedirs(OUTPUT_DIR)
 
-def process_csv():
-    """Process CSV file and generate SQL files"""
-    create_output_directory()
-    
+def iter_grant_statements():
+    """Yield the grant statement in the first column of every CSV row, streaming"""
     with open(CSV_FILE_PATH, mode='r') as csv_file:
-        csv_reader = csv.reader(csv_file)
-        file_counter = 0
-        statement_counter = 0
-        current_file = None
-        
-        for row in csv_reader:
+        for row in csv.reader(csv_file):
             if not row:  # Skip empty rows
                 continue
-                
             grant_statement = row[0].strip()
-            if not grant_statement:  # Skip empty statements
-                continue
-                
-            # Start a new file when needed
-            if statement_counter % BATCH_SIZE == 0:
-                if current_file is not None:
-                    current_file.close()
-                
-                # Format the file number with leading zeros (0000, 0001, etc.)
-                file_number = f"{file_counter:04d}"
-                table_name = extract_table_name(grant_statement)
-                filename = f"{FILE_PREFIX}{file_number}___{table_name}_ownership_transfer.sql"
-                filepath = os.path.join(OUTPUT_DIR, filename)
-                
-                current_file = open(filepath, 'w')
-                current_file.write("-- Ownership transfer batch script\n")
-                current_file.write("-- Generated from CSV source\n\n")
-                file_counter += 1
-                
-            # Write the statement to the current file
+            if grant_statement:  # Skip empty statements
+                yield grant_statement
+
+def iter_batches(statements):
+    """Yield (filename, statements) for every BATCH_SIZE statements, named after the batch's first table"""
+    batch = []
+    file_counter = 0
+    for statement in statements:
+        batch.append(statement)
+        if len(batch) >= BATCH_SIZE:
+            yield batch_filename(file_counter, batch), batch
+            file_counter += 1
+            batch = []
+    if batch:
+        yield batch_filename(file_counter, batch), batch
+
+def batch_filename(file_counter, batch):
+    # Format the file number with leading zeros (0000, 0001, etc.)
+    return f"{FILE_PREFIX}{file_counter:04d}___{extract_table_name(batch[0])}_ownership_transfer.sql"
+
+def write_batch(filename, batch):
+    """Write one batch script to OUTPUT_DIR"""
+    with open(os.path.join(OUTPUT_DIR, filename), 'w') as current_file:
+        current_file.write("-- Ownership transfer batch script\n")
+        current_file.write("-- Generated from CSV source\n\n")
+        for grant_statement in batch:
             current_file.write(grant_statement + ";\n")
-            statement_counter += 1
-        
-        # Close the last file
-        if current_file is not None:
-            current_file.close()
-            
-    print(f"Processed {statement_counter} statements into {file_counter} files in '{OUTPUT_DIR}'")
+
+def tee_batches(batches, counts):
+    """Write each batch to OUTPUT_DIR (when set) before passing it on, counting statements and files"""
+    if OUTPUT_DIR:
+        create_output_directory()
+    for filename, batch in batches:
+        if OUTPUT_DIR:
+            write_batch(filename, batch)
+        counts['statements'] += len(batch)
+        counts['files'] += 1
+        yield filename, batch
+
+def process_csv():
+    """Process CSV file and generate SQL files, or run them as they are generated when EXECUTE is set"""
+    counts = {'statements': 0, 'files': 0}
+    batches = tee_batches(iter_batches(iter_grant_statements()), counts)
+
+    if EXECUTE:
+        # Only pipeline mode needs the parity scripts (and their dependencies)
+        sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'parity'))
+        import execution
+        from grant_stages import grant_stages
+        execution.run(grant_stages(batches, BATCH_SIZE))
+    else:
+        for _ in batches:
+            pass
+
+    if OUTPUT_DIR:
+        print(f"Processed {counts['statements']} statements into {counts['files']} files in '{OUTPUT_DIR}'")
+    else:
+        print(f"Processed {counts['statements']} statements in {counts['files']} batches")
 
 if __name__ == "__main__":
     process_csv()
@@ -1,11 +1,18 @@
 import pandas as pd
 import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'parity'))
+from transfer_output import TransferWriter
+from transfer_plan import plan_transfers, report_skipped
 
 # Configuration
 PROD_CSV = 'prod_ownership.csv'  # From production (schema, table, owner)
 TARGET_CSV = 'target_tables.csv'  # From target account (schema, table, current_owner)
 VALID_ROLES_CSV = 'valid_roles.csv'  # List of valid roles in target
 OUTPUT_DIR = 'ownership_transfers'
+BULK_WITH_OVERRIDES = True  # Bulk-grant schemas to their most common owner plus per-table overrides when that takes fewer statements
+LEGACY_PER_TABLE_FILES = False  # One .sql file per schema/table instead of bundles (see parity/transfer_output.py)
 
 def load_and_validate_data():
     """Load and validate all CSV data"""
@@ -22,71 +29,52 @@ def load_and_validate_data():
         raise ValueError(f"Target CSV missing required columns: {target_cols}")
     
     # Load valid roles
-    valid_roles = pd.read_csv(VALID_ROLES_CSV)['role_name'].tolist()
+    valid_roles = set(pd.read_csv(VALID_ROLES_CSV)['role_name'])
     
     return prod_df, target_df, valid_roles
 
 def generate_transfers(prod_df, target_df, valid_roles):
     """Generate transfer statements from CSV data"""
-    # Merge production and target data
-    merged_df = pd.merge(
-        prod_df,
-        target_df,
-        on=['schema_name', 'table_name'],
-        how='inner'  # Only tables that exist in both
-    )
-    
     # Create output directories
     bulk_dir = os.path.join(OUTPUT_DIR, 'bulk_schema_transfers')
     indiv_dir = os.path.join(OUTPUT_DIR, 'individual_transfers')
-    os.makedirs(bulk_dir, exist_ok=True)
-    os.makedirs(indiv_dir, exist_ok=True)
+    if LEGACY_PER_TABLE_FILES:
+        os.makedirs(bulk_dir, exist_ok=True)
+        os.makedirs(indiv_dir, exist_ok=True)
+    writer = TransferWriter(OUTPUT_DIR, legacy=LEGACY_PER_TABLE_FILES)
     
-    # Track processed schemas
-    processed_schemas = set()
+    # Plan transfers for tables in both environments whose owner changes
+    plan = plan_transfers(prod_df, target_df, valid_roles=valid_roles, overrides=BULK_WITH_OVERRIDES)
+    report_skipped(plan)
     
-    # First pass - identify schemas with uniform ownership
-    schema_stats = merged_df.groupby('schema_name')['owner'].agg(['nunique', 'first'])
-    uniform_schemas = schema_stats[schema_stats['nunique'] == 1]
+    def table_sql(row):
+        return (f"GRANT OWNERSHIP ON TABLE {row.schema_name}.{row.table_name} "
+                f"TO ROLE {row.owner} COPY CURRENT GRANTS;\n"
+                f"-- Production owner: {row.owner}\n"
+                f"-- Current owner: {row.current_owner}\n")
     
-    # Generate bulk transfers for uniform schemas
-    for schema, row in uniform_schemas.iterrows():
-        owner = row['first']
-        if owner not in valid_roles:
-            print(f"Skipping schema {schema} - invalid role: {owner}")
-            continue
-            
-        filename = f"bulk_{schema}.sql"
-        with open(os.path.join(bulk_dir, filename), 'w') as f:
-            f.write(f"GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {schema} ")
-            f.write(f"TO ROLE {owner} COPY CURRENT GRANTS;\n")
-            f.write(f"-- Production owner: {owner}\n")
-            f.write(f"-- Affects {len(merged_df[merged_df['schema_name'] == schema])} tables\n")
-        
-        processed_schemas.add(schema)
+    # Bulk transfers, each followed by the overrides for its exceptions
+    for row, overrides in plan.bulk_groups():
+        bulk_path = os.path.join(bulk_dir, f"bulk_{row.schema_name}.sql")
+        writer.write('bulk', row.schema_name, None,
+                     f"GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {row.schema_name} "
+                     f"TO ROLE {row.owner} COPY CURRENT GRANTS;\n"
+                     f"-- Production owner: {row.owner}\n"
+                     f"-- Affects {row.table_count} tables, {row.override_count} overridden below\n",
+                     bulk_path)
+        for override in overrides:
+            writer.write('bulk', override.schema_name, override.table_name, table_sql(override), bulk_path)
     
-    # Second pass - individual tables in non-uniform schemas
-    non_uniform = merged_df[~merged_df['schema_name'].isin(processed_schemas)]
-    
-    for _, row in non_uniform.iterrows():
-        if row['owner'] not in valid_roles:
-            print(f"Skipping {row['schema_name']}.{row['table_name']} - invalid role: {row['owner']}")
-            continue
-            
-        if row['owner'] == row['current_owner']:
-            continue  # No ownership change needed
-            
+    # Individual tables in the other schemas
+    for row in plan.individual.itertuples(index=False):
         # Create safe filename
-        safe_name = f"{row['schema_name']}_{row['table_name']}".replace('.', '_')
+        safe_name = f"{row.schema_name}_{row.table_name}".replace('.', '_')
         filename = f"indiv_{safe_name}.sql"
-        
-        with open(os.path.join(indiv_dir, filename), 'w') as f:
-            f.write(f"GRANT OWNERSHIP ON TABLE {row['schema_name']}.{row['table_name']} ")
-            f.write(f"TO ROLE {row['owner']} COPY CURRENT GRANTS;\n")
-            f.write(f"-- Production owner: {row['owner']}\n")
-            f.write(f"-- Current owner: {row['current_owner']}\n")
+        writer.write('individual', row.schema_name, row.table_name, table_sql(row),
+                     os.path.join(indiv_dir, filename))
     
-    print(f"Generated {len(uniform_schemas)} bulk and {len(non_uniform)} individual transfer files")
+    _, files = writer.close()
+    print(f"Generated {len(plan.bulk)} bulk, {len(plan.overrides)} override and {len(plan.individual)} individual transfers in {files} files")
 
 def main():
     try:
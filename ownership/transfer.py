@@ -1,16 +1,18 @@
 import pandas as pd
 import os
-import re
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'parity'))
+from transfer_output import TransferWriter, clean_name
+from transfer_plan import plan_transfers, report_skipped
 
 # Configuration - Update these paths to match your files
 PROD_OWNERSHIP_CSV = 'prod_table_ownership.csv'  # schema,table,owner
 TARGET_STATE_CSV = 'target_table_state.csv'      # schema,table,current_owner
 VALID_ROLES_CSV = 'valid_roles.csv'             # role_name
 OUTPUT_DIR = 'ownership_transfers'
-
-def clean_name(name):
-    """Sanitize names for safe filename use"""
-    return re.sub(r'[^a-zA-Z0-9_]', '_', name)
+BULK_WITH_OVERRIDES = True  # Bulk-grant schemas to their most common owner plus per-table overrides when that takes fewer statements
+LEGACY_PER_TABLE_FILES = False  # One .sql file per schema/table under bulk/ and individual/ instead of bundles
 
 def load_data():
     """Load and validate input CSV files"""
@@ -26,7 +28,7 @@ def load_data():
             raise ValueError("Target CSV must contain: schema, table, current_owner")
         
         # Load valid roles
-        valid_roles = pd.read_csv(VALID_ROLES_CSV)['role_name'].tolist()
+        valid_roles = set(pd.read_csv(VALID_ROLES_CSV)['role_name'])
         
         return prod_df, target_df, valid_roles
     
@@ -45,62 +47,48 @@ def generate_transfer_statements():
         return
     
     # Create output directories
-    os.makedirs(os.path.join(OUTPUT_DIR, 'bulk'), exist_ok=True)
-    os.makedirs(os.path.join(OUTPUT_DIR, 'individual'), exist_ok=True)
+    if LEGACY_PER_TABLE_FILES:
+        os.makedirs(os.path.join(OUTPUT_DIR, 'bulk'), exist_ok=True)
+        os.makedirs(os.path.join(OUTPUT_DIR, 'individual'), exist_ok=True)
+    writer = TransferWriter(OUTPUT_DIR, legacy=LEGACY_PER_TABLE_FILES)
     
-    # Merge production and target data
-    merged_df = pd.merge(
-        prod_df,
-        target_df,
-        on=['schema', 'table'],
-        how='inner',  # Only tables that exist in both
-        suffixes=('_prod', '_target')
+    # Plan transfers for tables in both environments whose owner changes
+    plan = plan_transfers(
+        prod_df.rename(columns={'schema': 'schema_name', 'table': 'table_name'}),
+        target_df.rename(columns={'schema': 'schema_name', 'table': 'table_name'}),
+        valid_roles=valid_roles,
+        overrides=BULK_WITH_OVERRIDES
     )
+    report_skipped(plan)
     
-    # Filter out tables where owner hasn't changed
-    changed_ownership = merged_df[merged_df['owner_prod'] != merged_df['owner_target']]
+    def table_sql(row):
+        return (f"-- TRANSFER {row.schema_name}.{row.table_name}\n"
+                f"-- Production owner: {row.owner}\n"
+                f"-- Current owner: {row.current_owner}\n\n"
+                f"GRANT OWNERSHIP ON TABLE {row.schema_name}.{row.table_name} "
+                f"TO ROLE {row.owner} COPY CURRENT GRANTS;\n")
     
-    # Group by schema to find uniform ownership
-    schema_groups = changed_ownership.groupby('schema')['owner_prod'].agg(['nunique', 'first'])
-    uniform_schemas = schema_groups[schema_groups['nunique'] == 1]
-    
-    # Generate bulk transfers for uniform schemas
-    for schema, row in uniform_schemas.iterrows():
-        owner = row['first']
-        if owner not in valid_roles:
-            print(f"Skipping schema {schema} - invalid role: {owner}")
-            continue
-            
-        # Count tables in this schema
-        table_count = len(changed_ownership[changed_ownership['schema'] == schema])
-        
-        # Write bulk transfer file
-        filename = f"bulk_{clean_name(schema)}.sql"
-        with open(os.path.join(OUTPUT_DIR, 'bulk', filename), 'w') as f:
-            f.write(f"-- TRANSFER ALL TABLES IN SCHEMA {schema}\n")
-            f.write(f"-- Production owner: {owner}\n")
-            f.write(f"-- Affects {table_count} tables\n\n")
-            f.write(f"GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {schema} ")
-            f.write(f"TO ROLE {owner} COPY CURRENT GRANTS;\n")
+    # Generate bulk transfers, each followed by the overrides for its exceptions
+    for row, overrides in plan.bulk_groups():
+        bulk_path = os.path.join(OUTPUT_DIR, 'bulk', f"bulk_{clean_name(row.schema_name)}.sql")
+        writer.write('bulk', row.schema_name, None,
+                     f"-- TRANSFER ALL TABLES IN SCHEMA {row.schema_name}\n"
+                     f"-- Production owner: {row.owner}\n"
+                     f"-- Affects {row.changed_count} tables, {row.override_count} overridden below\n\n"
+                     f"GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {row.schema_name} "
+                     f"TO ROLE {row.owner} COPY CURRENT GRANTS;\n",
+                     bulk_path)
+        for override in overrides:
+            writer.write('bulk', override.schema_name, override.table_name, table_sql(override), bulk_path)
     
     # Generate individual transfers for remaining tables
-    non_uniform = changed_ownership[~changed_ownership['schema'].isin(uniform_schemas.index)]
-    
-    for _, row in non_uniform.iterrows():
-        if row['owner_prod'] not in valid_roles:
-            print(f"Skipping {row['schema']}.{row['table']} - invalid role: {row['owner_prod']}")
-            continue
-            
-        # Create individual transfer file
-        filename = f"indiv_{clean_name(row['schema'])}_{clean_name(row['table'])}.sql"
-        with open(os.path.join(OUTPUT_DIR, 'individual', filename), 'w') as f:
-            f.write(f"-- TRANSFER {row['schema']}.{row['table']}\n")
-            f.write(f"-- Production owner: {row['owner_prod']}\n")
-            f.write(f"-- Current owner: {row['owner_target']}\n\n")
-            f.write(f"GRANT OWNERSHIP ON TABLE {row['schema']}.{row['table']} ")
-            f.write(f"TO ROLE {row['owner_prod']} COPY CURRENT GRANTS;\n")
+    for row in plan.individual.itertuples(index=False):
+        filename = f"indiv_{clean_name(row.schema_name)}_{clean_name(row.table_name)}.sql"
+        writer.write('individual', row.schema_name, row.table_name, table_sql(row),
+                     os.path.join(OUTPUT_DIR, 'individual', filename))
     
-    print(f"Generated {len(uniform_schemas)} bulk and {len(non_uniform)} individual transfer files")
+    _, files = writer.close()
+    print(f"Generated {len(plan.bulk)} bulk, {len(plan.overrides)} override and {len(plan.individual)} individual transfers in {files} files")
 
 if __name__ == "__main__":
     print("Starting ownership transfer script...")
@@ -0,0 +1,82 @@
+import threading
+from contextlib import contextmanager
+
+from sql_backend import StatementError
+
+# Snowflake errors that mean "back off" rather than "bad statement":
+# too many lock waiters (625), statement timeout (630), statement cancelled (604)
+CONTENTION_ERRORS = {604, 625, 630}
+
+LATENCY_TOLERANCE = 2.0  # Round-trip latency above this multiple of the baseline counts as congestion
+BASELINE_WEIGHT = 0.2    # Weight of each batch without contention errors in the moving latency baseline
+DECREASE_FACTOR = 0.5    # Multiplicative decrease applied to the limit on congestion
+
+def is_contention(error):
+    """Lock, timeout and throttling errors; network and service errors count too"""
+    if isinstance(error, StatementError):
+        return error.errno in CONTENTION_ERRORS
+    return True
+
+class AimdLimiter:
+    """
+    Additive-increase/multiplicative-decrease limit on in-flight batches.
+    Every uncongested batch raises the limit by one; a congested batch (contention
+    errors, or latency per round trip well above the baseline) halves it. Batches
+    submitted before the last decrease cannot decrease it again, so one episode
+    of congestion only backs off once.
+
+    Latency is measured per request sent, so a merged ALTER counts once however
+    many columns it adds. The baseline is a moving average over batches without
+    contention errors.
+    """
+
+    def __init__(self, min_limit, max_limit):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.limit = min_limit
+        self.baseline = None  # Moving average of the latency per round trip, in seconds
+        self.submitted = 0
+        self.last_decrease = 0
+
+    def ticket(self):
+        """Number the next submitted batch"""
+        self.submitted += 1
+        return self.submitted
+
+    def observe(self, ticket, requests, seconds, contention_errors):
+        """Update the limit from a finished batch that sent `requests` round trips and return it"""
+        if requests == 0 and contention_errors == 0:
+            return self.limit
+        latency = seconds / requests if requests else None
+        congested = contention_errors > 0 or (
+            self.baseline is not None and latency > self.baseline * LATENCY_TOLERANCE)
+        if contention_errors == 0:
+            self.baseline = latency if self.baseline is None else \
+                self.baseline + BASELINE_WEIGHT * (latency - self.baseline)
+
+        if congested and ticket > self.last_decrease:
+            self.limit = max(self.min_limit, int(self.limit * DECREASE_FACTOR))
+            self.last_decrease = self.submitted
+            print(f"Congestion detected ({contention_errors} contention errors, "
+                  f"{latency or 0:.3f}s per round trip); concurrency down to {self.limit}.")
+        elif not congested and self.limit < self.max_limit:
+            self.limit += 1
+        return self.limit
+
+class SchemaSlots:
+    """Cap the number of sessions running statements against the same schema at once"""
+
+    def __init__(self, per_schema):
+        self.per_schema = per_schema
+        self.slots = {}
+        self.lock = threading.Lock()
+
+    @contextmanager
+    def hold(self, schema):
+        if schema is None:
+            yield
+            return
+        with self.lock:
+            slot = self.slots.setdefault(schema, threading.BoundedSemaphore(self.per_schema))
+        with slot:
+            yield
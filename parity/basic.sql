@@ -6,7 +6,7 @@ SELECT table_schema, table_name, table_type
 FROM information_schema.tables
 WHERE table_catalog = 'PROD_DATABASE_NAME';
 
-SELECT table_schema, table_name, column_name, data_type, is_nullable, column_default
+SELECT table_schema, table_name, column_name, ordinal_position, data_type, is_nullable, column_default
 FROM information_schema.columns
 WHERE table_catalog = 'PROD_DATABASE_NAME';
 
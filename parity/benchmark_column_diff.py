@@ -0,0 +1,66 @@
+import resource
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+from diff_catalogs import COLUMN_NAME_KEYS, missing_rows
+
+# Synthetic catalog size
+NUM_COLUMNS = 5_000_000    # Prod columns
+COLUMNS_PER_TABLE = 25
+NUM_SCHEMAS = 200
+MISSING_FRACTION = 0.01    # Share of prod columns absent from QA
+
+def make_catalog():
+    """Build synthetic prod and QA column catalogs with pyarrow-backed strings"""
+    rng = np.random.default_rng(0)
+    ids = np.arange(NUM_COLUMNS)
+    table_ids = ids // COLUMNS_PER_TABLE
+    text = 'string[pyarrow]'
+    prod = pd.DataFrame({
+        'TABLE_SCHEMA': ('SCHEMA_' + pd.Series(table_ids % NUM_SCHEMAS).astype(str)).astype(text),
+        'TABLE_NAME': ('TABLE_' + pd.Series(table_ids).astype(str)).astype(text),
+        'COLUMN_NAME': ('COLUMN_' + pd.Series(ids % COLUMNS_PER_TABLE).astype(str)).astype(text),
+        'ORDINAL_POSITION': pd.array(ids % COLUMNS_PER_TABLE + 1, dtype='Int32'),
+        'DATA_TYPE': pd.Series(rng.choice(['NUMBER', 'TEXT', 'TIMESTAMP_NTZ'], NUM_COLUMNS)).astype(text),
+        'IS_NULLABLE': pd.Series(rng.choice(['YES', 'NO'], NUM_COLUMNS)).astype(text),
+        'COLUMN_DEFAULT': pd.Series(rng.choice([None, '0'], NUM_COLUMNS)).astype(text),
+    })
+    qa = prod[rng.random(NUM_COLUMNS) >= MISSING_FRACTION].reset_index(drop=True)
+    return prod, qa
+
+def outer_merge(prod, qa):
+    """The original Step 5 diff: outer merge with indicator over the full catalogs"""
+    merged = pd.merge(prod, qa, on=COLUMN_NAME_KEYS, how='outer', indicator=True)
+    return merged[merged['_merge'] == 'left_only']
+
+def run(method):
+    """Build the catalog, diff it with `method` and print rows, time and peak RSS"""
+    prod, qa = make_catalog()
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+
+    start = time.perf_counter()
+    if method == 'merge':
+        missing = outer_merge(prod, qa)
+    else:
+        missing = missing_rows(prod, qa, COLUMN_NAME_KEYS)
+    elapsed = time.perf_counter() - start
+
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+    print(f"{method:>9}: {len(missing)} missing columns in {elapsed:.1f}s, "
+          f"peak RSS {peak_rss} MB ({peak_rss - baseline_rss} MB above the loaded catalogs)")
+
+def main():
+    if len(sys.argv) > 1:
+        run(sys.argv[1])
+        return
+
+    # Each method runs in its own process so peak RSS is measured independently
+    print(f"Catalog: {NUM_COLUMNS} prod columns, {MISSING_FRACTION:.0%} missing in QA")
+    for method in ('merge', 'anti-join'):
+        subprocess.run([sys.executable, __file__, method], check=True)
+
+if __name__ == "__main__":
+    main()
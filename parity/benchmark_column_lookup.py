@@ -0,0 +1,81 @@
+import time
+import numpy as np
+import pandas as pd
+
+from diff_catalogs import build_column_index, create_table_ddl
+
+# Synthetic catalog size
+NUM_SCHEMAS = 20
+NUM_TABLES = 4000          # Total prod tables
+COLUMNS_PER_TABLE = 50     # Columns per table
+MISSING_TABLES = 1000      # Tables missing in QA that need a CREATE TABLE
+
+def make_catalog():
+    """Build a synthetic prod column catalog and a set of missing tables"""
+    rng = np.random.default_rng(0)
+    table_ids = np.repeat(np.arange(NUM_TABLES), COLUMNS_PER_TABLE)
+    columns = pd.DataFrame({
+        'TABLE_SCHEMA': [f"SCHEMA_{t % NUM_SCHEMAS}" for t in table_ids],
+        'TABLE_NAME': [f"TABLE_{t}" for t in table_ids],
+        'COLUMN_NAME': [f"COL_{i}" for i in range(len(table_ids))],
+        'ORDINAL_POSITION': np.tile(np.arange(1, COLUMNS_PER_TABLE + 1), NUM_TABLES),
+        'DATA_TYPE': rng.choice(['NUMBER', 'TEXT', 'DATE', 'BOOLEAN'], len(table_ids)),
+        'IS_NULLABLE': rng.choice(['YES', 'NO'], len(table_ids)),
+        'COLUMN_DEFAULT': rng.choice([None, '0'], len(table_ids)),
+    })
+    # Shuffle so columns are not already grouped by table
+    columns = columns.sample(frac=1, random_state=0).reset_index(drop=True)
+
+    missing = rng.choice(NUM_TABLES, MISSING_TABLES, replace=False)
+    missing_tables = pd.DataFrame({
+        'TABLE_SCHEMA': [f"SCHEMA_{t % NUM_SCHEMAS}" for t in missing],
+        'TABLE_NAME': [f"TABLE_{t}" for t in missing],
+    })
+    return columns, missing_tables
+
+def per_table_filter(columns, missing_tables):
+    """The original Step 2 lookup: one boolean mask over the full catalog per table"""
+    ddl = []
+    for _, row in missing_tables.iterrows():
+        table_columns = columns[
+            (columns['TABLE_SCHEMA'] == row['TABLE_SCHEMA']) &
+            (columns['TABLE_NAME'] == row['TABLE_NAME'])
+        ].sort_values('ORDINAL_POSITION')
+        columns_ddl = []
+        for _, col in table_columns.iterrows():
+            col_def = f"{col['COLUMN_NAME']} {col['DATA_TYPE']}"
+            if col['IS_NULLABLE'] == 'NO':
+                col_def += " NOT NULL"
+            if 'COLUMN_DEFAULT' in col and pd.notna(col['COLUMN_DEFAULT']):
+                col_def += f" DEFAULT {col['COLUMN_DEFAULT']}"
+            columns_ddl.append(col_def)
+        create_table_ddl = f"CREATE TABLE IF NOT EXISTS {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} (\n"
+        create_table_ddl += ",\n".join(columns_ddl)
+        create_table_ddl += "\n);"
+        ddl.append(create_table_ddl)
+    return ddl
+
+def indexed_lookup(columns, missing_tables):
+    """The indexed Step 2 lookup used by script.py"""
+    column_index = build_column_index(columns, missing_tables)
+    return [create_table_ddl(row.TABLE_SCHEMA, row.TABLE_NAME, column_index)
+            for row in missing_tables.itertuples(index=False)]
+
+def main():
+    columns, missing_tables = make_catalog()
+    print(f"Catalog: {len(columns)} columns, {MISSING_TABLES} missing tables")
+
+    start = time.perf_counter()
+    old_ddl = per_table_filter(columns, missing_tables)
+    old_time = time.perf_counter() - start
+    print(f"Per-table filter: {old_time:.2f}s")
+
+    start = time.perf_counter()
+    new_ddl = indexed_lookup(columns, missing_tables)
+    new_time = time.perf_counter() - start
+    print(f"Indexed lookup:   {new_time:.2f}s")
+
+    print(f"Speedup: {old_time / new_time:.1f}x, identical output: {old_ddl == new_ddl}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+import execution
+
+# Synthetic DDL workload, run against the local backend (see sql_backend.py)
+NUM_SCHEMAS = 20
+NUM_TABLES = 2_000
+ADDED_COLUMNS = 3          # ALTER TABLE ... ADD COLUMN statements per table
+STATEMENTS_PER_FILE = 200
+LATENCY = 0.005            # Simulated round trip per statement, in seconds
+JITTER = 0.002
+FAILURE_RATE = 0.001
+
+# (label, workers, adaptive, merge_add_columns)
+CONFIGURATIONS = [
+    ('serial', 1, False, False),
+    ('serial, merged ALTERs', 1, False, True),
+    ('8 workers', 8, False, True),
+    ('16 workers', 16, False, True),
+    ('16 workers, adaptive', 16, True, True),
+]
+
+def write_workload(directory):
+    """Write split files of CREATE TABLE and ADD COLUMN statements; returns the statement count"""
+    statements = []
+    for table in range(NUM_TABLES):
+        name = f"S{table % NUM_SCHEMAS}.T{table}"
+        statements.append(f"CREATE TABLE IF NOT EXISTS {name} (\nID NUMBER NOT NULL,\nNAME TEXT\n)")
+        statements.extend(f"ALTER TABLE {name} ADD COLUMN C{column} NUMBER" for column in range(ADDED_COLUMNS))
+    for start in range(0, len(statements), STATEMENTS_PER_FILE):
+        with open(os.path.join(directory, f"file{start // STATEMENTS_PER_FILE + 1:04d}.sql"), 'w') as f:
+            f.writelines(statement + ';\n' for statement in statements[start:start + STATEMENTS_PER_FILE])
+    return len(statements)
+
+def run(directory, workers, adaptive, merge):
+    """Run execution.py once on a fresh local backend; returns (seconds, output)"""
+    execution.input_dir = os.path.join(directory, 'split_files')
+    execution.input_format = 'files'
+    execution.backend = 'local'
+    execution.local_backend_options = {
+        'latency': LATENCY, 'jitter': JITTER, 'failure_rate': FAILURE_RATE, 'seed': 0,
+        'schemas': [f"S{schema}" for schema in range(NUM_SCHEMAS)],
+    }
+    execution.workers = workers
+    execution.adaptive = adaptive
+    execution.merge_add_columns = merge
+    execution.resume = False
+    execution.journal_file = os.path.join(directory, 'journal.tsv')
+    execution.telemetry_file = None
+    execution.failed_queries_file = os.path.join(directory, 'failed_queries.sql')
+
+    output = io.StringIO()
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(output):
+        execution.main()
+    return time.perf_counter() - start, output.getvalue()
+
+def main():
+    with tempfile.TemporaryDirectory() as directory:
+        os.makedirs(os.path.join(directory, 'split_files'))
+        count = write_workload(os.path.join(directory, 'split_files'))
+        print(f"{count} statements, {LATENCY * 1000:.0f}ms simulated latency")
+        for label, workers, adaptive, merge in CONFIGURATIONS:
+            seconds, output = run(directory, workers, adaptive, merge)
+            summary = output.strip().splitlines()[-1]
+            print(f"{label:>22}: {seconds:6.1f}s, {count / seconds:7.0f} statements/s  ({summary.split('.')[0]})")
+
+if __name__ == "__main__":
+    main()
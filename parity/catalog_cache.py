@@ -0,0 +1,181 @@
+import json
+import os
+import re
+import sys
+import time
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+# Configuration
+CATALOG_CACHE_DIR = '.catalog_cache'   # One subdirectory per account/database
+CATALOG_TTL = 6 * 60 * 60              # Seconds before cached roles or tables are fetched again
+META_FILE = 'meta.json'                # Roles, fetch times, cached schemas and invalidated objects
+TABLES_FILE = 'tables.parquet'         # table_schema, table_name, table_owner
+SCHEMAS_PER_QUERY = 1000               # Schema names per server-side IN (...) filter
+
+TABLE_COLUMNS = ['table_schema', 'table_name', 'table_owner']
+TABLES_SCHEMA = pa.schema([(name, pa.string()) for name in TABLE_COLUMNS])
+TABLES_QUERY = (
+    "SELECT table_schema, table_name, table_owner "
+    "FROM information_schema.tables "
+    "WHERE table_type = 'BASE TABLE'"
+)
+
+def sql_string(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+def fetch_tables(session, filters=('',)):
+    """
+    Run the tables query once per filter and collect the connector's Arrow result
+    batches into one columnar table; no Python row tuples are built.
+    """
+    pieces = []
+    for condition in filters:
+        session.execute(TABLES_QUERY + condition)
+        for batch in session.fetch_arrow_batches():
+            pieces.append(batch.rename_columns(TABLE_COLUMNS).cast(TABLES_SCHEMA))
+    return pa.concat_tables(pieces) if pieces else TABLES_SCHEMA.empty_table()
+
+def schema_filters(schemas):
+    """Server-side 'AND table_schema IN (...)' conditions, SCHEMAS_PER_QUERY names each"""
+    schemas = sorted(schemas)
+    return [
+        f" AND table_schema IN ({', '.join(sql_string(schema) for schema in schemas[start:start + SCHEMAS_PER_QUERY])})"
+        for start in range(0, len(schemas), SCHEMAS_PER_QUERY)
+    ]
+
+def table_names(tables):
+    """'schema.table' names as one Arrow string array, joined column-wise without Python strings"""
+    names = pc.binary_join_element_wise(tables['table_schema'], tables['table_name'], '.')
+    return names.combine_chunks() if names.num_chunks else pa.array([], pa.string())
+
+class CatalogCache:
+    """
+    Roles, tables and table owners of one account/database, kept on disk between runs.
+    Roles and tables are each fetched again once older than `ttl` seconds; objects
+    passed to invalidate() are re-fetched on their own at the next load, so a run
+    that changed a few owners doesn't throw away the whole catalog. Loads limited
+    to some schemas only fetch the schemas the cache doesn't hold yet.
+    """
+
+    def __init__(self, account, database, ttl=CATALOG_TTL, cache_dir=CATALOG_CACHE_DIR):
+        self.path = os.path.join(cache_dir, re.sub(r'[^a-zA-Z0-9_]', '_', f"{account}_{database}"))
+        self.ttl = ttl
+
+    def read_meta(self):
+        try:
+            with open(os.path.join(self.path, META_FILE), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def write_meta(self, meta):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, META_FILE + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, os.path.join(self.path, META_FILE))
+
+    def write_tables(self, tables):
+        os.makedirs(self.path, exist_ok=True)
+        tmp_path = os.path.join(self.path, TABLES_FILE + '.tmp')
+        pq.write_table(tables, tmp_path)
+        os.replace(tmp_path, os.path.join(self.path, TABLES_FILE))
+
+    def expired(self, fetched_at):
+        return fetched_at is None or time.time() - fetched_at > self.ttl
+
+    def load(self, connect, schemas=None):
+        """
+        Return (roles, tables): the set of role names, and a pyarrow Table of
+        table_schema, table_name, table_owner. With `schemas`, tables are only
+        fetched for those schemas, filtered server-side; the returned table then
+        holds at least those schemas. `connect` opens a session and is only
+        called when something has to be fetched.
+        """
+        meta = self.read_meta()
+        tables_path = os.path.join(self.path, TABLES_FILE)
+        cached_schemas = meta.get('table_schemas')  # None when the whole database is cached
+        session = None
+        try:
+            if self.expired(meta.get('roles_fetched_at')):
+                session = session or connect()
+                session.execute("SHOW ROLES")
+                meta['roles'] = sorted({row[1] for row in session.fetchall()})
+                meta['roles_fetched_at'] = time.time()
+                print(f"Fetched {len(meta['roles'])} roles")
+
+            if self.expired(meta.get('tables_fetched_at')) or not os.path.exists(tables_path) \
+                    or (schemas is None and cached_schemas is not None):
+                session = session or connect()
+                fetched_at = time.time()
+                tables = fetch_tables(session, schema_filters(schemas) if schemas is not None else ('',))
+                meta['tables_fetched_at'] = fetched_at
+                meta['table_schemas'] = sorted(schemas) if schemas is not None else None
+                meta['stale_objects'] = []
+                self.write_tables(tables)
+                print(f"Fetched {tables.num_rows} tables")
+            else:
+                tables = pq.read_table(tables_path)
+                missing = set(schemas) - set(cached_schemas) if schemas is not None and cached_schemas is not None else set()
+                changed = False
+                if missing:
+                    session = session or connect()
+                    fresh = fetch_tables(session, schema_filters(missing))
+                    tables = pa.concat_tables([tables, fresh])
+                    meta['table_schemas'] = sorted(set(cached_schemas) | missing)
+                    changed = True
+                    print(f"Fetched {fresh.num_rows} tables in {len(missing)} more schemas")
+                if meta.get('stale_objects'):
+                    session = session or connect()
+                    tables = self.refresh_objects(session, tables, meta['stale_objects'])
+                    meta['stale_objects'] = []
+                    changed = True
+                if changed:
+                    self.write_tables(tables)
+        finally:
+            if session is not None:
+                session.close()
+
+        self.write_meta(meta)
+        return set(meta['roles']), tables
+
+    def refresh_objects(self, session, tables, objects):
+        """Re-fetch invalidated 'SCHEMA' or 'SCHEMA.TABLE' entries and patch them into `tables`"""
+        by_schema = {}
+        for name in objects:
+            schema, _, table = name.partition('.')
+            by_schema.setdefault(schema, set()).add(table or None)
+
+        stale = None
+        filters = []
+        for schema, names in by_schema.items():
+            match = pc.equal(tables['table_schema'], schema)
+            condition = f" AND table_schema = {sql_string(schema)}"
+            if None not in names:
+                match = pc.and_(match, pc.is_in(tables['table_name'], pa.array(sorted(names))))
+                condition += f" AND table_name IN ({', '.join(sql_string(name) for name in sorted(names))})"
+            stale = match if stale is None else pc.or_(stale, match)
+            filters.append(condition)
+
+        fresh = fetch_tables(session, filters)
+        print(f"Refreshed {len(objects)} invalidated objects")
+        return pa.concat_tables([tables.filter(pc.invert(stale)), fresh])
+
+    def invalidate(self, objects=(), roles=False):
+        """Mark 'SCHEMA' or 'SCHEMA.TABLE' names, and optionally the roles, to be fetched again"""
+        meta = self.read_meta()
+        if roles:
+            meta.pop('roles_fetched_at', None)
+        meta['stale_objects'] = sorted(set(meta.get('stale_objects', [])) | set(objects))
+        self.write_meta(meta)
+
+if __name__ == "__main__":
+    # python catalog_cache.py ACCOUNT DATABASE [--roles] [SCHEMA | SCHEMA.TABLE ...]
+    if len(sys.argv) < 3:
+        print("Usage: python catalog_cache.py ACCOUNT DATABASE [--roles] [SCHEMA | SCHEMA.TABLE ...]")
+        sys.exit(1)
+    names = [arg for arg in sys.argv[3:] if arg != '--roles']
+    CatalogCache(sys.argv[1], sys.argv[2]).invalidate(names, roles='--roles' in sys.argv[3:])
+    print(f"Invalidated {len(names)} objects" + (" and roles" if '--roles' in sys.argv[3:] else ""))
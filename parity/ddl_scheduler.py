@@ -0,0 +1,132 @@
+import os
+import re
+
+from sql_statements import IDENTIFIER, iter_statements, statement_kind, statement_target, normalize, split_name, strip_literals
+
+# DDL files written by script.py
+DDL_FILES = [
+    'create_schemas_qa.sql',
+    'create_tables_qa.sql',
+    'create_views_qa.sql',
+    'create_materialized_views_qa.sql',
+    'alter_tables_qa.sql',
+]
+
+# References inside a view definition: names after FROM/JOIN (unqualified ones
+# resolve to the view's own schema), and any qualified db.schema.name / schema.name
+TABLE_REFERENCE = re.compile(
+    rf"\b(?:FROM|JOIN)\s+(?!LATERAL\b|TABLE\s*\()({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}})(?![\w$\"]|\s*\.)",
+    re.I
+)
+QUALIFIED_REFERENCE = re.compile(rf"({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{1,2}})")
+VIEW_BODY = re.compile(r"\sAS\s", re.I)
+# Common table expressions, "WITH name AS (" or ", name (columns) AS (": reading them isn't reading a table
+CTE_NAME = re.compile(rf"(?:\bWITH\s+(?:RECURSIVE\s+)?|,)\s*({IDENTIFIER})\s*(?:\([^()]*\)\s*)?AS\s*\(", re.I)
+# Parentheses and SELECTs, to tell a query's FROM from one inside a call like EXTRACT(year FROM d)
+QUERY_LEVEL = re.compile(r'"(?:[^"]|"")*"|[()]|\bSELECT\b', re.I)
+
+def table_references(statement, schema):
+    """Return the (schema, name) pairs read after FROM/JOIN in a view or materialized view definition"""
+    definition = strip_literals(VIEW_BODY.split(statement, 1)[-1])
+    ctes = {normalize(match.group(1)) for match in CTE_NAME.finditer(definition)}
+    # Whether each open parenthesis level is a query, i.e. has a SELECT of its own
+    levels = [False]
+    tokens = QUERY_LEVEL.finditer(definition)
+    token = next(tokens, None)
+    references = set()
+    for match in TABLE_REFERENCE.finditer(definition):
+        while token is not None and token.start() < match.start():
+            if token.group() == '(':
+                levels.append(False)
+            elif token.group() == ')':
+                if len(levels) > 1:
+                    levels.pop()
+            elif not token.group().startswith('"'):
+                levels[-1] = True
+            token = next(tokens, None)
+        if not levels[-1]:
+            continue
+        parts = split_name(match.group(1))
+        if len(parts) > 1:
+            references.add((parts[-2], parts[-1]))
+        elif parts[0] not in ctes:
+            references.add((schema, parts[0]))
+    return references
+
+def view_references(statement, schema):
+    """
+    Return the (schema, name) pairs a view or materialized view definition may refer to.
+    Besides table_references, every qualified name outside strings and comments
+    counts, which also catches comma joins; qualified column names come along but
+    only names of generated objects become dependencies.
+    """
+    references = table_references(statement, schema)
+    for match in QUALIFIED_REFERENCE.finditer(strip_literals(VIEW_BODY.split(statement, 1)[-1])):
+        parts = split_name(match.group(1))
+        references.add((parts[-2], parts[-1]))
+    return references
+
+def build_schedule(paths, ddl_dir='.'):
+    """
+    Build a dependency graph over the generated DDL and return its topological levels.
+    Schemas come before their objects, tables before the ALTERs and views that use
+    them, and views after the views they reference. Each level is a list of
+    statements, in input order, that can run concurrently.
+    """
+    statements = []
+    for path in paths:
+        full_path = os.path.join(ddl_dir, path)
+        if os.path.exists(full_path):
+            for statement in iter_statements(full_path):
+                kind = statement_kind(statement)
+                schema, name = statement_target(statement)
+                statements.append((statement, kind, schema, name))
+
+    # Which statement creates each schema and object
+    schema_creators = {}
+    object_creators = {}
+    for position, (_, kind, schema, name) in enumerate(statements):
+        if kind == 'create_schema':
+            schema_creators.setdefault(schema, position)
+        elif kind.startswith('create') and name is not None:
+            object_creators.setdefault((schema, name), position)
+
+    dependencies = [set() for _ in statements]
+    for position, (statement, kind, schema, name) in enumerate(statements):
+        if kind != 'create_schema' and schema in schema_creators:
+            dependencies[position].add(schema_creators[schema])
+        if kind == 'alter_table' and (schema, name) in object_creators:
+            dependencies[position].add(object_creators[(schema, name)])
+        if kind in ('create_view', 'create_materialized_view'):
+            for reference in view_references(statement, schema):
+                if reference in object_creators:
+                    dependencies[position].add(object_creators[reference])
+        dependencies[position].discard(position)
+
+    # Kahn's algorithm, one level at a time
+    dependents = [[] for _ in statements]
+    remaining = [len(deps) for deps in dependencies]
+    for position, deps in enumerate(dependencies):
+        for dependency in deps:
+            dependents[dependency].append(position)
+
+    levels = []
+    ready = [position for position, count in enumerate(remaining) if count == 0]
+    scheduled = 0
+    while ready:
+        levels.append([statements[position][0] for position in ready])
+        scheduled += len(ready)
+        next_ready = []
+        for position in ready:
+            for dependent in dependents[position]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    next_ready.append(dependent)
+        ready = sorted(next_ready)
+
+    if scheduled < len(statements):
+        cyclic = [statements[position][0] for position, count in enumerate(remaining) if count > 0]
+        print(f"Warning: {len(cyclic)} statements have circular dependencies; running them last")
+        levels.append(cyclic)
+
+    return levels
@@ -0,0 +1,212 @@
+import numpy as np
+import pandas as pd
+
+# Output files, in the order the steps run
+OUTPUT_FILES = {
+    'schemas': 'create_schemas_qa.sql',
+    'tables': 'create_tables_qa.sql',
+    'views': 'create_views_qa.sql',
+    'materialized_views': 'create_materialized_views_qa.sql',
+    'alter': 'alter_tables_qa.sql',
+}
+
+TABLE_KEYS = ['TABLE_SCHEMA', 'TABLE_NAME']
+COLUMN_NAME_KEYS = ['TABLE_SCHEMA', 'TABLE_NAME', 'COLUMN_NAME']
+FINGERPRINT_COLUMNS = ['COLUMN_NAME', 'DATA_TYPE', 'IS_NULLABLE', 'COLUMN_DEFAULT']
+
+def key_codes(prod, qa, keys):
+    """
+    Intern the key columns of both sides into shared integer codes, one per distinct key tuple.
+    Codes come from the prod keys; QA keys that never occur in prod get -1.
+    """
+    prod_codes = np.zeros(len(prod), dtype='int64')
+    qa_codes = np.zeros(len(qa), dtype='int64')
+    for key in keys:
+        codes, uniques = pd.factorize(prod[key], use_na_sentinel=False)
+        qa_key_codes = pd.Index(uniques).get_indexer(qa[key])
+
+        # Fold this key into the codes so far and re-compact them to 0..n-1
+        width = len(uniques)
+        prod_combined = prod_codes * width + codes
+        qa_combined = np.where((qa_codes < 0) | (qa_key_codes < 0), -1, qa_codes * width + qa_key_codes)
+        prod_codes, combined_uniques = pd.factorize(prod_combined)
+        qa_codes = pd.Index(combined_uniques).get_indexer(qa_combined)
+    return prod_codes, qa_codes
+
+def missing_rows(prod, qa, keys):
+    """
+    Anti-join on interned key codes: the prod rows whose keys do not exist in QA.
+    Only prod's rows are returned, so no QA attributes are copied; rows come in key order like the outer merge did.
+    """
+    if qa.empty:
+        return prod.sort_values(keys, kind='stable')
+    prod_codes, qa_codes = key_codes(prod, qa, keys)
+    missing = ~pd.Series(prod_codes).isin(qa_codes[qa_codes >= 0]).to_numpy()
+    return prod[missing].sort_values(keys, kind='stable')
+
+def table_fingerprints(columns):
+    """
+    Hash each table's ordered (name, type, nullability, default) column tuples.
+    Returns a Series of uint64 fingerprints indexed by (TABLE_SCHEMA, TABLE_NAME).
+    """
+    order = TABLE_KEYS + (['ORDINAL_POSITION'] if 'ORDINAL_POSITION' in columns else ['COLUMN_NAME'])
+    columns = columns.sort_values(order, kind='stable')
+    attributes = [col for col in FINGERPRINT_COLUMNS if col in columns]
+
+    # Hash each column tuple together with its position so the sum per table is order-sensitive
+    row_hashes = pd.util.hash_pandas_object(columns[attributes], index=False).to_numpy()
+    positions = columns.groupby(TABLE_KEYS, sort=False).cumcount().to_numpy()
+    positioned = pd.util.hash_pandas_object(pd.DataFrame({'row': row_hashes, 'position': positions}), index=False)
+    return positioned.groupby([columns['TABLE_SCHEMA'].to_numpy(), columns['TABLE_NAME'].to_numpy()]).sum()
+
+def changed_tables(prod_columns, qa_columns):
+    """Return the (schema, table) keys whose prod fingerprint is missing or different in QA"""
+    prod_fingerprints = table_fingerprints(prod_columns)
+    qa_fingerprints = table_fingerprints(qa_columns)
+
+    positions = qa_fingerprints.index.get_indexer(prod_fingerprints.index)
+    qa_values = qa_fingerprints.to_numpy()[positions] if len(qa_fingerprints) else positions
+    matched = (positions >= 0) & (qa_values == prod_fingerprints.to_numpy())
+    return prod_fingerprints.index[~matched]
+
+def rows_in_tables(columns, tables):
+    """Keep the column rows that belong to the given (schema, table) keys"""
+    return columns[pd.MultiIndex.from_frame(columns[TABLE_KEYS]).isin(tables)]
+
+def column_drift(prod_columns, qa_columns):
+    """Return the columns present on both sides whose type or nullability differs, in key order"""
+    attributes = [col for col in ('DATA_TYPE', 'IS_NULLABLE') if col in prod_columns and col in qa_columns]
+    both = pd.merge(
+        prod_columns[COLUMN_NAME_KEYS + attributes],
+        qa_columns[COLUMN_NAME_KEYS + attributes],
+        on=COLUMN_NAME_KEYS,
+        suffixes=('', '_QA')
+    )
+    for col in attributes:
+        both[col + '_CHANGED'] = both[col].fillna('') != both[col + '_QA'].fillna('')
+    drifted = both[both[[col + '_CHANGED' for col in attributes]].any(axis=1)] if attributes else both.iloc[0:0]
+    return drifted.sort_values(COLUMN_NAME_KEYS, kind='stable')
+
+def column_definitions(columns):
+    """Build the 'name type [NOT NULL] [DEFAULT x]' fragment for every column row"""
+    col_defs = columns['COLUMN_NAME'].astype(str) + ' ' + columns['DATA_TYPE'].astype(str)
+    col_defs = col_defs.where(columns['IS_NULLABLE'] != 'NO', col_defs + ' NOT NULL')
+    if 'COLUMN_DEFAULT' in columns:
+        has_default = columns['COLUMN_DEFAULT'].notna()
+        col_defs = col_defs.where(~has_default, col_defs + ' DEFAULT ' + columns['COLUMN_DEFAULT'].astype(str))
+    return col_defs
+
+def build_column_index(columns, tables=None):
+    """
+    Group the column catalog once by (schema, table).
+    Returns {(schema, table): "col_def,\\ncol_def,..."} with columns in ORDINAL_POSITION order.
+    If `tables` is given, only those (schema, table) keys are indexed.
+    """
+    if tables is not None:
+        columns = columns.merge(tables[TABLE_KEYS].drop_duplicates(), on=TABLE_KEYS, how='inner')
+    if columns.empty:
+        return {}
+
+    # Keep the export order within a table unless ORDINAL_POSITION is available
+    if 'ORDINAL_POSITION' in columns:
+        columns = columns.sort_values(TABLE_KEYS + ['ORDINAL_POSITION'], kind='stable')
+
+    col_defs = column_definitions(columns)
+    grouped = col_defs.groupby([columns['TABLE_SCHEMA'], columns['TABLE_NAME']], sort=False).agg(',\n'.join)
+    return grouped.to_dict()
+
+def create_table_ddl(schema, table, column_index):
+    """Build the CREATE TABLE statement for a base table from the column index"""
+    create_table_ddl = f"CREATE TABLE IF NOT EXISTS {schema}.{table} (\n"
+    create_table_ddl += column_index.get((schema, table), '')
+    create_table_ddl += "\n);"
+    return create_table_ddl
+
+def generate_ddl(prod, qa):
+    """
+    Diff the prod catalogs against QA.
+    Returns {schema: {output: ddl text}} with the statements for each output file.
+    """
+    statements = {}
+
+    def emit(schema, output, ddl):
+        statements.setdefault(schema, {}).setdefault(output, []).append(ddl)
+
+    # Step 1: Create missing schemas
+    missing_schemas = set(prod['schemas']['SCHEMA_NAME']) - set(qa['schemas']['SCHEMA_NAME'])
+    for schema in missing_schemas:
+        emit(schema, 'schemas', f"CREATE SCHEMA IF NOT EXISTS {schema};\n")
+
+    # Step 2: Create missing tables (including external tables)
+    missing_tables = missing_rows(prod['tables'], qa['tables'], TABLE_KEYS)
+
+    # Index the prod columns of the missing base tables once instead of filtering per table
+    missing_base_tables = missing_tables[missing_tables['TABLE_TYPE'] == 'BASE TABLE']
+    column_index = build_column_index(prod['columns'], missing_base_tables)
+
+    for _, row in missing_tables.iterrows():
+        if row['TABLE_TYPE'] == 'BASE TABLE':
+            # Generate CREATE TABLE statement for base tables
+            emit(row['TABLE_SCHEMA'], 'tables', create_table_ddl(row['TABLE_SCHEMA'], row['TABLE_NAME'], column_index) + "\n\n")
+
+        elif row['TABLE_TYPE'] == 'EXTERNAL TABLE':
+            # Generate CREATE EXTERNAL TABLE statement
+            emit(row['TABLE_SCHEMA'], 'tables', f"CREATE EXTERNAL TABLE IF NOT EXISTS {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} ...;\n")
+            # Add external table-specific logic (e.g., location, file format) as needed.
+
+    # Step 3: Create missing views
+    missing_views = missing_rows(prod['views'], qa['views'], TABLE_KEYS)
+
+    for _, row in missing_views.iterrows():
+        create_view_ddl = f"CREATE OR REPLACE VIEW {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} AS {row['VIEW_DEFINITION']};\n"
+        emit(row['TABLE_SCHEMA'], 'views', create_view_ddl)
+
+    # Step 4: Create missing materialized views
+    missing_materialized_views = missing_rows(prod['materialized_views'], qa['materialized_views'], TABLE_KEYS)
+
+    for _, row in missing_materialized_views.iterrows():
+        create_materialized_view_ddl = f"CREATE MATERIALIZED VIEW {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} AS ...;\n"
+        emit(row['TABLE_SCHEMA'], 'materialized_views', create_materialized_view_ddl)
+
+    # Step 5: Alter tables whose column fingerprint differs from QA; identical tables are skipped
+    tables_to_compare = changed_tables(prod['columns'], qa['columns'])
+    prod_columns = rows_in_tables(prod['columns'], tables_to_compare)
+    qa_columns = rows_in_tables(qa['columns'], tables_to_compare)
+
+    # Add missing columns
+    missing_columns = missing_rows(prod_columns, qa_columns, COLUMN_NAME_KEYS)
+
+    for _, row in missing_columns.iterrows():
+        alter_table_ddl = f"ALTER TABLE {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} "
+        alter_table_ddl += f"ADD COLUMN {row['COLUMN_NAME']} {row['DATA_TYPE']}"
+        if row['IS_NULLABLE'] == 'NO':
+            alter_table_ddl += " NOT NULL"
+        if 'COLUMN_DEFAULT' in row and pd.notna(row['COLUMN_DEFAULT']):
+            alter_table_ddl += f" DEFAULT {row['COLUMN_DEFAULT']}"
+        alter_table_ddl += ";\n"
+        emit(row['TABLE_SCHEMA'], 'alter', alter_table_ddl)
+
+    # Alter columns whose type or nullability drifted
+    for row in column_drift(prod_columns, qa_columns).itertuples(index=False):
+        alter_column_ddl = f"ALTER TABLE {row.TABLE_SCHEMA}.{row.TABLE_NAME} ALTER COLUMN {row.COLUMN_NAME} "
+        if getattr(row, 'DATA_TYPE_CHANGED', False):
+            emit(row.TABLE_SCHEMA, 'alter', alter_column_ddl + f"SET DATA TYPE {row.DATA_TYPE};\n")
+        if getattr(row, 'IS_NULLABLE_CHANGED', False):
+            nullability = "SET NOT NULL" if row.IS_NULLABLE == 'NO' else "DROP NOT NULL"
+            emit(row.TABLE_SCHEMA, 'alter', alter_column_ddl + f"{nullability};\n")
+
+    return {
+        schema: {output: ''.join(ddl) for output, ddl in outputs.items()}
+        for schema, outputs in statements.items()
+    }
+
+def write_ddl(ddl):
+    """Write the per-schema DDL into the output files, schemas in sorted order"""
+    files = {output: open(path, 'w') for output, path in OUTPUT_FILES.items()}
+    try:
+        for schema in sorted(ddl):
+            for output, text in ddl[schema].items():
+                files[output].write(text)
+    finally:
+        for f in files.values():
+            f.close()
@@ -1,58 +1,86 @@
 import re
 
+from sql_statements import IDENTIFIER, iter_statements, terminated, LIST_TOKENS
+
+# Input and output file paths
+input_file = "input.sql"  # Replace with your input SQL file path
+output_file = "output.sql"  # Replace with your output SQL file path
+
+# Keywords that start an out-of-line constraint rather than a column definition
+CONSTRAINT_KEYWORDS = {'CONSTRAINT', 'PRIMARY', 'UNIQUE', 'FOREIGN', 'CHECK'}
+
+SKIPPED = r"(?:\s|--[^\n]*\n?|/\*.*?(?:\*/|\Z))*"  # Whitespace and comments
+
+# Unquoted name at the start of a column definition, after any whitespace and comments
+COLUMN_NAME = re.compile(rf"{SKIPPED}([A-Za-z_][\w$]*)", re.S)
+
+# "CREATE [OR REPLACE] TABLE [IF NOT EXISTS] name (" up to the column list's opening parenthesis
+CREATE_TABLE_HEADER = re.compile(
+    rf"{SKIPPED}CREATE\s+(?:OR\s+REPLACE\s+)?TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?"
+    rf"{IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}}{SKIPPED}\(",
+    re.I | re.S
+)
+
+def column_list_start(sql_statement):
+    """Position of the '(' opening a CREATE TABLE column list, or None (e.g. CREATE TABLE ... AS SELECT)"""
+    match = CREATE_TABLE_HEADER.match(sql_statement)
+    return match.end() - 1 if match else None
+
 def quote_column_names(sql_statement):
     """
     Convert all column names in a CREATE TABLE statement to double-quoted names.
+    One pass over the column list tracks parenthesis depth, string literals and
+    comments, so types like NUMBER(38,0), defaults and constraints are left
+    alone and only the name at the start of each column definition is quoted.
+    Names that are already quoted are kept as they are.
     """
-    # Extract the text between parentheses (column definitions)
-    column_section_match = re.search(r'\(([\s\S]*?)\)', sql_statement)
-    if not column_section_match:
+    start = column_list_start(sql_statement)
+    if start is None:
         return sql_statement  # No column definitions found
 
-    column_section = column_section_match.group(1)
-
-    # Regex to match column names (everything before the data type)
-    column_pattern = re.compile(r'([^,\n]+)\s+(\w+)')
-
-    # Replace column names with double-quoted names
-    def quote_match(match):
-        column_name = match.group(1).strip()
-        data_type = match.group(2).strip()
-        # Wrap column name in double quotes
-        return f'"{column_name}" {data_type}'
+    pieces = []
+    copied = 0
+    depth = 0
+    for token in LIST_TOKENS.finditer(sql_statement, start):
+        char = sql_statement[token.start()]
+        if char == '(':
+            depth += 1
+            if depth > 1:
+                continue
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                break
+            continue
+        elif char != ',' or depth > 1:
+            continue  # Strings, quoted names, comments, commas inside types
 
-    # Apply the replacement only to column names in the column section
-    quoted_column_section = column_pattern.sub(quote_match, column_section)
+        # A new column definition starts after the opening '(' or a top-level ','
+        name = COLUMN_NAME.match(sql_statement, token.end())
+        if name and name.group(1).upper() not in CONSTRAINT_KEYWORDS:
+            pieces.append(sql_statement[copied:name.start(1)])
+            pieces.append(f'"{name.group(1)}"')
+            copied = name.end(1)
 
-    # Replace the original column section with the quoted version
-    quoted_sql = sql_statement.replace(column_section, quoted_column_section)
-    return quoted_sql
+    pieces.append(sql_statement[copied:])
+    return ''.join(pieces)
 
 def process_sql_file(input_file, output_file):
     """
     Process an SQL file containing CREATE TABLE statements and quote column names.
+    Statements are streamed from input to output, so memory stays bounded by the
+    largest statement. Returns the number of statements written.
     """
-    with open(input_file, 'r') as infile, open(output_file, 'w') as outfile:
-        sql_content = infile.read()  # Read the entire SQL file
-
-        # Split the SQL content into individual statements
-        sql_statements = re.split(r';\s*\n', sql_content)
-
-        for statement in sql_statements:
-            # Check if the statement contains a CREATE TABLE statement
-            if "CREATE TABLE IF NOT EXISTS" in statement.upper():
-                # Quote column names in the CREATE TABLE statement
-                modified_statement = quote_column_names(statement)
-                outfile.write(modified_statement + ";\n")
-            else:
-                # Write the statement as-is if it's not a CREATE TABLE statement
-                outfile.write(statement + ";\n")
-
-# Input and output file paths
-input_file = "input.sql"  # Replace with your input SQL file path
-output_file = "output.sql"  # Replace with your output SQL file path
+    count = 0
+    with open(output_file, 'w') as outfile:
+        for statement in iter_statements(input_file):
+            # Quote column names in CREATE TABLE statements; others are written as-is
+            outfile.write(terminated(quote_column_names(statement)))
+            count += 1
+    return count
 
-# Process the SQL file
-process_sql_file(input_file, output_file)
+if __name__ == "__main__":
+    # Process the SQL file
+    process_sql_file(input_file, output_file)
 
-print(f"Processed SQL file saved to {output_file}")
+    print(f"Processed SQL file saved to {output_file}")
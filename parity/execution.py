@@ -1,6 +1,16 @@
 import os
-import snowflake.connector
-from snowflake.connector import ProgrammingError
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from sql_statements import iter_statements, statement_target, terminated
+from statement_store import iter_store_chunks
+from ddl_scheduler import DDL_FILES, build_schedule
+from execution_journal import JOURNAL_FILE, ExecutionJournal, statement_hash
+from statement_telemetry import TELEMETRY_FILE, TelemetryLog, statement_record
+from adaptive_concurrency import AimdLimiter, SchemaSlots, is_contention
+from sql_backend import SnowflakeBackend, LocalBackend, StatementError
 
 # Snowflake connection details
 SNOWFLAKE_ACCOUNT = 'your_account'
@@ -10,69 +20,402 @@ SNOWFLAKE_WAREHOUSE = 'your_warehouse'
 SNOWFLAKE_DATABASE = 'your_database'  # Default database (can be overridden)
 SNOWFLAKE_ROLE = 'ACCOUNTADMIN'  # Specify the role here
 
+# Backend: 'snowflake' runs against the account above, 'local' against an in-process
+# SQLite stand-in (see sql_backend.py) for testing and benchmarking without an account
+backend = 'snowflake'
+local_backend_options = {'latency': 0.05, 'jitter': 0.02, 'failure_rate': 0.0}
+
 # Directory containing split SQL files
 input_dir = 'split_files'
 
+# Input format: 'files' runs every .sql file in input_dir, 'store' runs the statement
+# store written by split_file.py with output_format = 'store', chunk by chunk,
+# 'scheduled' runs the DDL files from script.py level by level in dependency order
+input_format = 'files'
+
+# Directory holding script.py's DDL files for input_format = 'scheduled'
+ddl_dir = '.'
+batch_size = 50  # Statements per batch when a dependency level is spread over workers
+
+# Database set at the start of every split file/chunk (only re-issued when the session has left it)
+target_database = 'abcd'  # Replace with the desired database name
+
+# Send consecutive "ALTER TABLE t ADD COLUMN ..." statements for the same table
+# as one ALTER with up to max_merged_columns columns, saving a round trip per column
+merge_add_columns = False
+max_merged_columns = 100
+
+# Number of concurrent sessions. Each worker owns its own session,
+# so USE DATABASE/USE SCHEMA state never leaks between workers.
+workers = 1
+
+# With adaptive concurrency the number of batches in flight starts at min_workers
+# and moves between min_workers and workers: +1 per healthy batch, halved when
+# batches hit lock/timeout errors or their latency degrades (see adaptive_concurrency.py)
+adaptive = False
+min_workers = 1
+
+# Maximum sessions running statements against the same schema at once, so
+# parallel ALTERs don't queue up on the same locks (None disables)
+schema_concurrency = 2
+
 # File to store failed queries
 failed_queries_file = 'failed_queries.sql'
 
-# Initialize Snowflake connection
-conn = snowflake.connector.connect(
-    user=SNOWFLAKE_USER,
-    password=SNOWFLAKE_PASSWORD,
-    account=SNOWFLAKE_ACCOUNT,
-    warehouse=SNOWFLAKE_WAREHOUSE,
-    database=SNOWFLAKE_DATABASE,  # Default database
-    role=SNOWFLAKE_ROLE  # Use the specified role
-)
-cursor = conn.cursor()
-
-# Open the failed queries file for writing
-with open(failed_queries_file, 'w') as failed_file:
-    # Iterate over all split files in the directory
-    for filename in sorted(os.listdir(input_dir)):
-        if filename.endswith('.sql'):
-            file_path = os.path.join(input_dir, filename)
-            print(f"Executing queries from {filename}...")
-
-            # Set the database dynamically (e.g., 'abcd')
-            target_database = 'abcd'  # Replace with the desired database name
-            cursor.execute(f"USE DATABASE {target_database};")
-            print(f"Set database to {target_database}.")
-
-            # Read the file and split into individual queries
-            with open(file_path, 'r') as sql_file:
-                queries = sql_file.read().split(';\n')
-
-            # Execute each query
-            for query in queries:
-                query = query.strip()
-                if not query:
-                    continue  # Skip empty queries
-
-                try:
-                    # Extract schema from the query (if applicable)
-                    # Example: If the query is "USE SCHEMA schema_name;"
-                    if query.upper().startswith('USE SCHEMA'):
-                        schema_name = query.split()[-1].strip(';')
-                        cursor.execute(f"USE SCHEMA {schema_name};")
-                        print(f"Set schema to {schema_name}.")
-                        continue  # Skip executing the USE SCHEMA query again
-
-                    # Execute the query
-                    cursor.execute(query)
-                    print(f"Success: {query}")
-                except ProgrammingError as e:
-                    # Log the failed query to the failed_queries file
-                    failed_file.write(query + ';\n')
-                    print(f"Failed: {query}\nError: {e}")
-                except Exception as e:
-                    # Handle other exceptions (e.g., network errors)
-                    failed_file.write(query + ';\n')
-                    print(f"Failed: {query}\nError: {e}")
-
-# Close the Snowflake connection
-cursor.close()
-conn.close()
-
-print(f"Execution complete. Failed queries are logged in '{failed_queries_file}'.")
+# Journal of statement outcomes. A normal run starts a fresh journal; with
+# --resume, statements the journal records as successful are skipped and only
+# failed or unattempted ones are run.
+journal_file = JOURNAL_FILE
+resume = '--resume' in sys.argv
+
+# Per-statement timings and outcomes, appended across runs (JSONL, or CSV if the
+# name ends in .csv; None disables). Summarize with: python statement_telemetry.py
+telemetry_file = TELEMETRY_FILE
+
+ADD_COLUMN = re.compile(r"ALTER\s+TABLE\s+(\S+)\s+ADD\s+COLUMN\s+(?!IF\s+NOT\s+EXISTS\b)(.+)", re.I | re.S)
+
+def make_backend():
+    """Create the configured backend; sessions are only opened once work starts"""
+    if backend == 'local':
+        return LocalBackend(**local_backend_options)
+    return SnowflakeBackend(
+        user=SNOWFLAKE_USER,
+        password=SNOWFLAKE_PASSWORD,
+        account=SNOWFLAKE_ACCOUNT,
+        warehouse=SNOWFLAKE_WAREHOUSE,
+        database=SNOWFLAKE_DATABASE,  # Default database
+        role=SNOWFLAKE_ROLE  # Use the specified role
+    )
+
+def iter_batches():
+    """Yield (label, queries) for every split file or store chunk, in order"""
+    if input_format == 'store':
+        for chunk, queries in iter_store_chunks(input_dir):
+            yield f"chunk {chunk + 1}", queries
+    else:
+        for filename in sorted(os.listdir(input_dir)):
+            if filename.endswith('.sql'):
+                yield filename, iter_statements(os.path.join(input_dir, filename))
+
+def iter_stages():
+    """
+    Yield the stages to run, in order. Each stage is an iterable of (label, queries)
+    batches; every batch of a stage finishes before the next stage starts.
+    """
+    if input_format == 'scheduled':
+        for number, level in enumerate(build_schedule(DDL_FILES, ddl_dir), start=1):
+            yield [
+                (f"level {number} batch {start // batch_size + 1}", level[start:start + batch_size])
+                for start in range(0, len(level), batch_size)
+            ]
+    else:
+        yield iter_batches()
+
+def timed_execute(session, sql, telemetry, label):
+    """Execute one request on a session, recording its timing and outcome when telemetry is on"""
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        session.execute(sql)
+    except Exception as e:
+        if telemetry:
+            telemetry.record(statement_record(
+                sql, start, time.perf_counter() - started, query_id=getattr(e, 'query_id', None),
+                error_code=getattr(e, 'errno', None) or type(e).__name__, batch=label
+            ))
+        raise
+    if telemetry:
+        telemetry.record(statement_record(
+            sql, start, time.perf_counter() - started, rows=session.rowcount,
+            query_id=session.query_id, batch=label
+        ))
+
+def set_database(execute, context):
+    """Start a batch in target_database's default schema, only issuing USE DATABASE when that changes the session"""
+    if context.get('database') != target_database or context.get('schema') is not None:
+        execute(f"USE DATABASE {target_database};")
+        print(f"Set database to {target_database}.")
+        context['database'] = target_database
+        context['schema'] = None
+
+class BatchStartError(Exception):
+    """A batch's session could not be opened or set to target_database; counts as contention"""
+
+def fail_batch(label, queries, error, journal):
+    """
+    Record every statement of a batch that could not start as failed, so it is
+    logged to failed_queries_file and re-run on resume, and the run goes on.
+    Returns the same tuple as run_batch.
+    """
+    print(f"Failed to start {label}: {error}")
+    error = BatchStartError(error)
+    skipped = 0
+    failures = []
+    for query in queries:
+        query = query.strip()
+        if not query:
+            continue
+        if not query.upper().startswith('USE SCHEMA'):
+            digest = statement_hash(query)
+            if journal.is_done(digest):
+                skipped += 1  # Already succeeded in an earlier run
+                continue
+            journal.record(digest, False)
+        failures.append((query, error))
+    return 0, skipped, failures, 0
+
+def execute_statement(execute, query, digest, journal):
+    """Execute one statement and journal its outcome. Returns the error, or None on success"""
+    try:
+        execute(query)
+    except StatementError as e:
+        error = e
+    except Exception as e:
+        # Handle other exceptions (e.g., network errors)
+        error = e
+    else:
+        journal.record(digest, True)
+        print(f"Success: {query}")
+        return None
+    journal.record(digest, False)
+    print(f"Failed: {query}\nError: {error}")
+    return error
+
+def execute_add_columns(execute, table, group, journal):
+    """
+    Execute consecutive ADD COLUMN statements for one table as a single ALTER.
+    The ALTER is atomic, so if it fails the statements are retried one by one to
+    find out which of them failed. Returns (success count, [(query, error), ...])
+    """
+    if len(group) > 1:
+        merged = f"ALTER TABLE {table} ADD COLUMN " + ", ".join(definition for _, _, definition in group)
+        try:
+            execute(merged)
+        except Exception as e:
+            print(f"Merged ALTER on {table} failed, retrying its {len(group)} statements one by one. Error: {e}")
+        else:
+            for query, digest, _ in group:
+                journal.record(digest, True)
+                print(f"Success: {query}")
+            return len(group), []
+
+    successes = 0
+    failures = []
+    for query, digest, _ in group:
+        error = execute_statement(execute, query, digest, journal)
+        if error is None:
+            successes += 1
+        else:
+            failures.append((query, error))
+    return successes, failures
+
+def run_batch(session, context, label, queries, journal, telemetry, schema_slots=None):
+    """
+    Run one split file/chunk on a session, journaling every outcome. `context` holds
+    the session's current database and schema so USE statements are only re-issued
+    when they change it. With merge_add_columns, consecutive ADD COLUMN statements
+    for the same table go out as one ALTER. With schema_slots, each statement
+    waits for a free slot on the schema it targets.
+    Returns (success count, skipped count, [(query, error), ...], requests sent)
+    """
+    print(f"Executing queries from {label}...")
+    requests = 0
+
+    def execute(sql):
+        nonlocal requests
+        requests += 1
+        if schema_slots is None:
+            timed_execute(session, sql, telemetry, label)
+            return
+        schema, name = statement_target(sql)
+        if schema is None and name is not None:
+            schema = context.get('schema')  # Unqualified name in the session's schema
+        with schema_slots.hold(schema):
+            timed_execute(session, sql, telemetry, label)
+
+    # Set the database dynamically
+    try:
+        set_database(execute, context)
+    except Exception as e:
+        context.clear()  # The session's database is unknown now; set it again next batch
+        return fail_batch(label, queries, e, journal)
+
+    successes = 0
+    skipped = 0
+    failures = []
+    pending_table = None
+    pending = []  # (query, digest, column definition) waiting to be merged
+
+    def flush():
+        nonlocal successes, pending_table, pending
+        if pending:
+            done, failed = execute_add_columns(execute, pending_table, pending, journal)
+            successes += done
+            failures.extend(failed)
+        pending_table = None
+        pending = []
+
+    for query in queries:
+        query = query.strip()
+        if not query:
+            continue  # Skip empty queries
+
+        # Extract schema from the query (if applicable)
+        # Example: If the query is "USE SCHEMA schema_name;"
+        if query.upper().startswith('USE SCHEMA'):
+            flush()
+            schema_name = query.split()[-1].strip(';')
+            if context.get('schema') == schema_name:
+                continue  # Session is already in this schema
+            try:
+                execute(f"USE SCHEMA {schema_name};")
+                context['schema'] = schema_name
+                print(f"Set schema to {schema_name}.")
+            except Exception as e:
+                failures.append((query, e))
+                print(f"Failed: {query}\nError: {e}")
+            continue  # Skip executing the USE SCHEMA query again
+
+        digest = statement_hash(query)
+        if journal.is_done(digest):
+            skipped += 1  # Already succeeded in an earlier run
+            continue
+
+        match = ADD_COLUMN.match(query) if merge_add_columns else None
+        if pending and (match is None or match.group(1) != pending_table or len(pending) >= max_merged_columns):
+            flush()
+        if match:
+            pending_table = match.group(1)
+            pending.append((query, digest, match.group(2)))
+            continue
+
+        # Execute the query
+        error = execute_statement(execute, query, digest, journal)
+        if error is None:
+            successes += 1
+        else:
+            failures.append((query, error))
+    flush()
+    return successes, skipped, failures, requests
+
+def run_serial(record, sql_backend, journal, telemetry, stages):
+    """Run every batch on a single session, connecting again for the next batch if connecting fails"""
+    session = None
+    context = {}
+    try:
+        for stage in stages:
+            for label, queries in stage:
+                if session is None:
+                    try:
+                        session = sql_backend.connect()
+                    except Exception as e:
+                        record(fail_batch(label, queries, e, journal))
+                        continue
+                record(run_batch(session, context, label, queries, journal, telemetry))
+    finally:
+        if session is not None:
+            session.close()
+
+def run_parallel(record, sql_backend, journal, telemetry, stages):
+    """
+    Spread batches over a bounded pool of `workers` sessions, stage by stage.
+    Each worker thread lazily opens its own session. With adaptive concurrency
+    the number of batches in flight follows the AIMD limiter; otherwise at most two
+    batches per worker are read ahead, so memory stays bounded on large inputs.
+    """
+    local = threading.local()
+    sessions = []
+    sessions_lock = threading.Lock()
+
+    def worker_session():
+        if not hasattr(local, 'session'):
+            local.session = sql_backend.connect()
+            local.context = {}
+            with sessions_lock:
+                sessions.append(local.session)
+        return local.session
+
+    limiter = AimdLimiter(min_workers, workers) if adaptive else None
+    schema_slots = SchemaSlots(schema_concurrency) if schema_concurrency else None
+
+    def work(label, queries):
+        try:
+            session = worker_session()
+        except Exception as e:
+            return fail_batch(label, queries, e, journal), 0.0
+        started = time.perf_counter()
+        result = run_batch(session, local.context, label, queries, journal, telemetry, schema_slots)
+        return result, time.perf_counter() - started
+
+    def finish(future, ticket):
+        result, seconds = future.result()
+        record(result)
+        if limiter:
+            _, _, failures, requests = result
+            contention = sum(1 for _, error in failures if is_contention(error))
+            limiter.observe(ticket, requests, seconds, contention)
+
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for stage in stages:
+                pending = {}  # future -> limiter ticket
+                for label, queries in stage:
+                    while len(pending) >= (limiter.limit if limiter else workers * 2):
+                        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            finish(future, pending.pop(future))
+                    future = pool.submit(work, label, list(queries))
+                    pending[future] = limiter.ticket() if limiter else 0
+                # Finish the whole stage before starting the next one
+                for future in list(pending):
+                    finish(future, pending.pop(future))
+    finally:
+        for session in sessions:
+            session.close()
+
+def run(stages=None):
+    """
+    Execute `stages` (see iter_stages(); defaults to the configured input) and
+    print the totals. Stages are consumed lazily, so a caller can generate
+    batches while earlier ones are already running.
+    """
+    if stages is None:
+        stages = iter_stages()
+    totals = {'success': 0, 'skipped': 0, 'failed': 0}
+    journal = ExecutionJournal(journal_file, resume=resume)
+    if resume:
+        print(f"Resuming: {len(journal.succeeded)} statements already succeeded according to '{journal_file}'.")
+    telemetry = TelemetryLog(telemetry_file) if telemetry_file else None
+    sql_backend = make_backend()
+
+    # Open the failed queries file for writing; results from every worker are recorded here
+    with open(failed_queries_file, 'w') as failed_file:
+        def record(result):
+            successes, skipped, failures, _ = result
+            totals['success'] += successes
+            totals['skipped'] += skipped
+            totals['failed'] += len(failures)
+            for query, _ in failures:
+                # Log the failed query to the failed_queries file
+                failed_file.write(terminated(query))
+
+        try:
+            if workers > 1:
+                run_parallel(record, sql_backend, journal, telemetry, stages)
+            else:
+                run_serial(record, sql_backend, journal, telemetry, stages)
+        finally:
+            # Flush buffered outcomes even when the run is interrupted
+            journal.close()
+            if telemetry:
+                telemetry.close()
+
+    print(f"Execution complete: {totals['success']} succeeded, {totals['skipped']} skipped, "
+          f"{totals['failed']} failed. Failed queries are logged in '{failed_queries_file}'.")
+    return totals
+
+def main():
+    run()
+
+if __name__ == "__main__":
+    main()
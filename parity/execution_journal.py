@@ -0,0 +1,61 @@
+import hashlib
+import os
+import threading
+
+# Configuration
+JOURNAL_FILE = 'execution_journal.tsv'  # One "hash<TAB>outcome" line per executed statement
+FLUSH_EVERY = 100                       # Outcomes buffered before they are appended to disk
+
+def statement_hash(query):
+    """Stable hash identifying a statement across runs"""
+    return hashlib.sha1(query.strip().encode('utf-8')).hexdigest()
+
+def load_succeeded(path=JOURNAL_FILE):
+    """Return the hashes whose latest journaled outcome is a success"""
+    succeeded = set()
+    if not os.path.exists(path):
+        return succeeded
+    with open(path, 'r') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 2:
+                continue  # Partially written line from an interrupted run
+            digest, outcome = parts[0], parts[1]
+            if outcome == 'ok':
+                succeeded.add(digest)
+            else:
+                succeeded.discard(digest)
+    return succeeded
+
+class ExecutionJournal:
+    """
+    Append-only journal of statement outcomes, shared by all worker threads.
+    Outcomes are buffered and appended in batches of FLUSH_EVERY; anything not yet
+    flushed when the process is killed is simply re-run on resume.
+    """
+
+    def __init__(self, path=JOURNAL_FILE, resume=False):
+        self.path = path
+        self.succeeded = load_succeeded(path) if resume else set()
+        self.buffer = []
+        self.lock = threading.Lock()
+        self.file = open(path, 'a' if resume else 'w')
+
+    def is_done(self, digest):
+        return digest in self.succeeded
+
+    def record(self, digest, ok):
+        with self.lock:
+            self.buffer.append(f"{digest}\t{'ok' if ok else 'failed'}\n")
+            if len(self.buffer) >= FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self):
+        self.file.writelines(self.buffer)
+        self.file.flush()
+        self.buffer = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.close()
@@ -1,13 +1,17 @@
 import pandas as pd
 import os
-import snowflake.connector
-from snowflake.connector import ProgrammingError
+from sql_backend import SnowflakeBackend, LocalBackend
+from transfer_output import TransferWriter
+from catalog_cache import CatalogCache, table_names
+from transfer_plan import plan_transfers, report_skipped
 
 # Configuration
 INPUT_CSV = 'table_ownership.csv'  # Expected columns: schema_name, table_name, owner
 OUTPUT_DIR = 'ownership_transfers'
 BULK_OUTPUT_DIR = os.path.join(OUTPUT_DIR, 'bulk_schema_transfers')
 INDIVIDUAL_OUTPUT_DIR = os.path.join(OUTPUT_DIR, 'individual_transfers')
+BULK_WITH_OVERRIDES = True  # Bulk-grant schemas to their most common owner plus per-table overrides when that takes fewer statements
+LEGACY_PER_TABLE_FILES = False  # One .sql file per schema/table in the directories above instead of bundles (see transfer_output.py)
 
 # Snowflake connection for validation (optional)
 VALIDATE = True  # Set to False to skip validation
@@ -15,89 +19,89 @@ SF_ACCOUNT = 'your_account'
 SF_USER = 'your_user'
 SF_PASSWORD = 'your_password'
 SF_WAREHOUSE = 'your_warehouse'
+SF_DATABASE = 'your_database'
 SF_ROLE = 'ACCOUNTADMIN'
 
-def validate_connection():
-    """Test Snowflake connection and get valid roles/tables"""
-    conn = snowflake.connector.connect(
+# Roles and tables are cached on disk between runs (see catalog_cache.py)
+CATALOG_TTL = 6 * 60 * 60   # Seconds; 0 fetches them again every run
+
+# Backend used for validation: 'snowflake', or 'local' for the SQLite stand-in in sql_backend.py
+BACKEND = 'snowflake'
+LOCAL_BACKEND_OPTIONS = {'roles': []}
+
+def make_backend():
+    """Create the configured backend; nothing connects until validation runs"""
+    if BACKEND == 'local':
+        return LocalBackend(**LOCAL_BACKEND_OPTIONS)
+    return SnowflakeBackend(
         user=SF_USER,
         password=SF_PASSWORD,
         account=SF_ACCOUNT,
         warehouse=SF_WAREHOUSE,
+        database=SF_DATABASE,
         role=SF_ROLE
     )
-    
-    # Get all existing roles
-    with conn.cursor() as cur:
-        cur.execute("SHOW ROLES")
-        valid_roles = [row[1] for row in cur.fetchall()]
-        
-        # Get all existing tables
-        cur.execute("""
-        SELECT table_schema || '.' || table_name 
-        FROM information_schema.tables 
-        WHERE table_type = 'BASE TABLE'
-        """)
-        valid_tables = set(row[0] for row in cur.fetchall())
-    
-    conn.close()
-    return valid_roles, valid_tables
+
+def validate_connection(schemas=None):
+    """
+    Get valid roles (a set) and tables ('schema.table' names, an Arrow string array), through the catalog cache.
+    Tables are only fetched for `schemas`, filtered server-side.
+    """
+    account = 'local' if BACKEND == 'local' else SF_ACCOUNT
+    cache = CatalogCache(account, SF_DATABASE, ttl=CATALOG_TTL)
+    valid_roles, tables = cache.load(make_backend().connect, schemas)
+    return valid_roles, table_names(tables)
 
 def generate_transfer_statements(df, valid_roles, valid_tables):
     """Generate transfer statements with validation"""
     # Create output directories
-    os.makedirs(BULK_OUTPUT_DIR, exist_ok=True)
-    os.makedirs(INDIVIDUAL_OUTPUT_DIR, exist_ok=True)
-    
-    # Track schemas with uniform ownership
-    schema_owners = df.groupby('schema_name')['owner'].agg(['unique', 'count'])
-    uniform_schemas = schema_owners[schema_owners['unique'].str.len() == 1]
+    if LEGACY_PER_TABLE_FILES:
+        os.makedirs(BULK_OUTPUT_DIR, exist_ok=True)
+        os.makedirs(INDIVIDUAL_OUTPUT_DIR, exist_ok=True)
+    writer = TransferWriter(OUTPUT_DIR, legacy=LEGACY_PER_TABLE_FILES)
     
-    # Generate bulk schema transfers
-    for schema, row in uniform_schemas.iterrows():
-        owner = row['unique'][0]
-        
-        if VALIDATE:
-            if owner not in valid_roles:
-                print(f"Skipping schema {schema} - invalid role: {owner}")
-                continue
-        
-        filename = f"bulk_transfer_{schema}.sql"
-        with open(os.path.join(BULK_OUTPUT_DIR, filename), 'w') as f:
-            f.write(f"-- Bulk ownership transfer for schema {schema}\n")
-            f.write(f"-- All tables owned by: {owner}\n\n")
-            f.write(f"GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {schema} TO ROLE {owner} COPY CURRENT GRANTS;\n")
-    
-    # Generate individual transfers for non-uniform schemas
-    non_uniform = df[~df['schema_name'].isin(uniform_schemas.index)]
-    
-    for _, row in non_uniform.iterrows():
-        full_table_name = f"{row['schema_name']}.{row['table_name']}"
-        
-        if VALIDATE:
-            if row['owner'] not in valid_roles:
-                print(f"Skipping {full_table_name} - invalid role: {row['owner']}")
-                continue
-            if full_table_name not in valid_tables:
-                print(f"Skipping {full_table_name} - table not found")
-                continue
-        
-        filename = f"transfer_{row['schema_name']}_{row['table_name']}.sql"
-        with open(os.path.join(INDIVIDUAL_OUTPUT_DIR, filename), 'w') as f:
-            f.write(f"-- Ownership transfer for {full_table_name}\n")
-            f.write(f"-- New owner: {row['owner']}\n\n")
-            f.write(f"GRANT OWNERSHIP ON TABLE {full_table_name} TO ROLE {row['owner']} COPY CURRENT GRANTS;\n")
+    # Plan bulk schema transfers (plus overrides) where they take fewer statements, individual ones elsewhere
+    plan = plan_transfers(df, valid_roles=valid_roles if VALIDATE else None,
+                          valid_tables=valid_tables if VALIDATE else None,
+                          overrides=BULK_WITH_OVERRIDES)
+    report_skipped(plan)
+
+    def table_sql(row):
+        full_table_name = f"{row.schema_name}.{row.table_name}"
+        return (f"-- Ownership transfer for {full_table_name}\n"
+                f"-- New owner: {row.owner}\n\n"
+                f"GRANT OWNERSHIP ON TABLE {full_table_name} TO ROLE {row.owner} COPY CURRENT GRANTS;\n")
+
+    for row, overrides in plan.bulk_groups():
+        bulk_path = os.path.join(BULK_OUTPUT_DIR, f"bulk_transfer_{row.schema_name}.sql")
+        writer.write('bulk', row.schema_name, None,
+                     f"-- Bulk ownership transfer for schema {row.schema_name}\n"
+                     f"-- Owner of {row.table_count - row.override_count} tables: {row.owner}\n\n"
+                     f"GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {row.schema_name} TO ROLE {row.owner} COPY CURRENT GRANTS;\n",
+                     bulk_path)
+        # Overrides go right after the bulk grant they correct
+        for override in overrides:
+            writer.write('bulk', override.schema_name, override.table_name, table_sql(override), bulk_path)
+
+    for row in plan.individual.itertuples(index=False):
+        filename = f"transfer_{row.schema_name}_{row.table_name}.sql"
+        writer.write('individual', row.schema_name, row.table_name, table_sql(row),
+                     os.path.join(INDIVIDUAL_OUTPUT_DIR, filename))
+
+    _, files = writer.close()
+    print(f"Wrote {plan.statement_count()} transfers ({len(plan.bulk)} bulk, {len(plan.overrides)} overrides, "
+          f"{len(plan.individual)} individual) to {files} files in '{OUTPUT_DIR}'")
 
 def main():
     # Load ownership data
     df = pd.read_csv(INPUT_CSV)
     
     # Validate against Snowflake if enabled
-    valid_roles, valid_tables = [], set()
+    valid_roles, valid_tables = set(), set()
     if VALIDATE:
         try:
             print("Validating roles and tables against Snowflake...")
-            valid_roles, valid_tables = validate_connection()
+            valid_roles, valid_tables = validate_connection(set(df['schema_name'].astype(str).unique()))
             print(f"Found {len(valid_roles)} valid roles and {len(valid_tables)} tables")
         except Exception as e:
             print(f"Validation failed: {str(e)}")
@@ -0,0 +1,78 @@
+import re
+
+from sql_statements import IDENTIFIER, split_name
+
+# Object a grant is on: every object in a schema or database, or one (qualified) object
+GRANT_TARGET = re.compile(
+    rf"\bON\s+(?:(?:ALL|FUTURE)\s+\w+\s+IN\s+(SCHEMA|DATABASE)\s+|\w+\s+)({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}})",
+    re.I
+)
+ALL_SCHEMAS = object()  # Schema of database-wide grants
+
+def grant_schema(grant_statement):
+    """
+    Return (schema, schema_wide) for a grant: the schema it touches (ALL_SCHEMAS for
+    database-wide grants, None when unknown) and whether it covers every object in it
+    """
+    match = GRANT_TARGET.search(grant_statement)
+    if not match:
+        return None, False
+    parts = split_name(match.group(2))
+    if match.group(1):
+        return (ALL_SCHEMAS if match.group(1).upper() == 'DATABASE' else parts[-1]), True
+    return (parts[-2] if len(parts) > 1 else None), False
+
+def grant_runs(batches, batch_size):
+    """
+    Regroup (label, grant statements) batches for execution into runs of consecutive
+    statements on one schema: (label, schema, schema_wide, statements). A run keeps
+    its statements in order on one session. Runs are capped at batch_size, except
+    runs holding a schema-wide grant: what follows the grant has to wait for it
+    anyway, and a split would hold up every other schema at the next stage.
+    """
+    run = []
+    for label, batch in batches:
+        for grant_statement in batch:
+            schema, wide = grant_schema(grant_statement)
+            if run and (schema != run_schema or schema is ALL_SCHEMAS or (len(run) >= batch_size and not run_wide)):
+                yield run_label, run_schema, run_wide, run
+                run = []
+            if not run:
+                run_label, run_schema, run_wide = label, schema, False
+            run.append(grant_statement)
+            run_wide = run_wide or wide
+    if run:
+        yield run_label, run_schema, run_wide, run
+
+def conflicts(touched, schema, wide):
+    """Whether a run on `schema` can't run alongside the runs of a stage (touched: schema -> any schema-wide grant)"""
+    if ALL_SCHEMAS in touched:
+        return True
+    if schema is ALL_SCHEMAS:
+        return bool(touched)
+    return schema in touched and (wide or touched[schema])
+
+def grant_stages(batches, batch_size):
+    """
+    Group grant batches into execution.py stages: every batch of a stage finishes
+    before the next stage starts. Runs on different schemas share a stage; a run
+    that would race a schema-wide grant on its schema (or any run, for a
+    database-wide grant) starts the next stage, so grants still land in input
+    order. Stages are built lazily, so each batch is only read once the executor
+    wants it.
+    """
+    runs = grant_runs(batches, batch_size)
+    upcoming = [next(runs, None)]
+
+    def stage():
+        touched = {}
+        while upcoming[0] is not None:
+            label, schema, wide, statements = upcoming[0]
+            if touched and conflicts(touched, schema, wide):
+                return
+            touched[schema] = touched.get(schema, False) or wide
+            upcoming[0] = next(runs, None)
+            yield label, statements
+
+    while upcoming[0] is not None:
+        yield stage()
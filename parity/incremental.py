@@ -0,0 +1,77 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+# Configuration
+STATE_DIR = '.parity_state'
+STATE_FILE = os.path.join(STATE_DIR, 'state.json')
+STATE_VERSION = 2  # Bump when the generated DDL changes shape so old state is ignored
+
+# Column holding the schema name in each metadata export
+SCHEMA_COLUMNS = {
+    'schemas': 'SCHEMA_NAME',
+    'tables': 'TABLE_SCHEMA',
+    'columns': 'TABLE_SCHEMA',
+    'views': 'TABLE_SCHEMA',
+    'materialized_views': 'TABLE_SCHEMA',
+}
+
+def catalog_fingerprints(catalog):
+    """
+    Summarize every schema of one side's catalogs.
+    Returns {schema: [(kind, row count, row hash sum), ...]}; the sum makes it independent of row order.
+    """
+    fingerprints = {}
+    for kind, df in sorted(catalog.items()):
+        if df.empty:
+            continue
+        schema_col = SCHEMA_COLUMNS[kind]
+        row_hashes = pd.util.hash_pandas_object(df[sorted(df.columns)], index=False)
+        stats = row_hashes.groupby(df[schema_col].values).agg(['count', 'sum'])
+        for schema, count, total in stats.itertuples():
+            fingerprints.setdefault(schema, []).append((kind, int(count), int(total) % 2**64))
+    return fingerprints
+
+def schema_digests(prod, qa):
+    """Return {schema: digest} over the prod and QA catalogs of every schema seen on either side"""
+    prod_fingerprints = catalog_fingerprints(prod)
+    qa_fingerprints = catalog_fingerprints(qa)
+
+    digests = {}
+    for schema in set(prod_fingerprints) | set(qa_fingerprints):
+        parts = {'prod': prod_fingerprints.get(schema, []), 'qa': qa_fingerprints.get(schema, [])}
+        digests[schema] = hashlib.blake2b(json.dumps(parts).encode(), digest_size=16).hexdigest()
+    return digests
+
+def load_state():
+    """Load the digests and per-schema DDL saved by the previous run"""
+    try:
+        with open(STATE_FILE, 'r') as f:
+            state = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {'version': STATE_VERSION, 'digests': {}, 'ddl': {}}
+    if state.get('version') != STATE_VERSION:
+        print("Incremental state is from an older version - re-diffing everything")
+        return {'version': STATE_VERSION, 'digests': {}, 'ddl': {}}
+    return state
+
+def save_state(digests, ddl):
+    """Save this run's digests and per-schema DDL for the next incremental run"""
+    os.makedirs(STATE_DIR, exist_ok=True)
+    tmp_path = STATE_FILE + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': STATE_VERSION, 'digests': digests, 'ddl': ddl}, f)
+    os.replace(tmp_path, STATE_FILE)
+
+def changed_schemas(digests, state):
+    """Return the schemas whose digest differs from (or is missing in) the saved state"""
+    previous = state['digests']
+    return {schema for schema, digest in digests.items() if previous.get(schema) != digest}
+
+def filter_catalog(catalog, schemas):
+    """Keep only the rows of the given schemas in every metadata export"""
+    return {
+        kind: df[df[SCHEMA_COLUMNS[kind]].isin(schemas)]
+        for kind, df in catalog.items()
+    }
@@ -0,0 +1,80 @@
+import csv
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pv
+
+# Columns read from each INFORMATION_SCHEMA export and their dtypes (see basic.sql)
+TEXT = 'string[pyarrow]'
+METADATA_COLUMNS = {
+    'schemas': {
+        'SCHEMA_NAME': TEXT,
+    },
+    'tables': {
+        'TABLE_SCHEMA': TEXT,
+        'TABLE_NAME': TEXT,
+        'TABLE_TYPE': TEXT,
+    },
+    'columns': {
+        'TABLE_SCHEMA': TEXT,
+        'TABLE_NAME': TEXT,
+        'COLUMN_NAME': TEXT,
+        'ORDINAL_POSITION': 'Int32',
+        'DATA_TYPE': TEXT,
+        'IS_NULLABLE': TEXT,
+        'COLUMN_DEFAULT': TEXT,
+    },
+    'views': {
+        'TABLE_SCHEMA': TEXT,
+        'TABLE_NAME': TEXT,
+        'VIEW_DEFINITION': TEXT,
+    },
+    'materialized_views': {
+        'TABLE_SCHEMA': TEXT,
+        'TABLE_NAME': TEXT,
+    },
+}
+
+# Arrow types used when streaming, matching the pandas dtypes above
+ARROW_TYPES = {TEXT: pa.string(), 'Int32': pa.int32()}
+
+# Bytes read per chunk when streaming an export
+BLOCK_SIZE = 64 * 1024 * 1024
+
+def metadata_dtypes(path, kind):
+    """Return {column: dtype} for the known columns present in the CSV header"""
+    with open(path, 'r', newline='') as f:
+        header = next(csv.reader(f), [])
+    return {col: dtype for col, dtype in METADATA_COLUMNS[kind].items() if col in header}
+
+def iter_metadata(path, kind, block_size=BLOCK_SIZE):
+    """
+    Stream a metadata export in chunks of roughly `block_size` bytes.
+    Yields DataFrames holding only the needed columns with explicit dtypes.
+    """
+    dtypes = metadata_dtypes(path, kind)
+    reader = pv.open_csv(
+        path,
+        read_options=pv.ReadOptions(block_size=block_size),
+        convert_options=pv.ConvertOptions(
+            include_columns=list(dtypes),
+            column_types={col: ARROW_TYPES[dtype] for col, dtype in dtypes.items()},
+            strings_can_be_null=True
+        )
+    )
+    for batch in reader:
+        yield batch.to_pandas().astype(dtypes)
+
+def load_metadata(path, kind, chunked=False, block_size=BLOCK_SIZE):
+    """
+    Load a metadata export with the pyarrow engine.
+    With chunked=True the file is streamed block by block, so the raw CSV is
+    never held in memory alongside the DataFrame.
+    """
+    dtypes = metadata_dtypes(path, kind)
+    if not chunked:
+        return pd.read_csv(path, engine='pyarrow', usecols=list(dtypes), dtype=dtypes)
+
+    chunks = list(iter_metadata(path, kind, block_size))
+    if not chunks:
+        return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in dtypes.items()})
+    return pd.concat(chunks, ignore_index=True)
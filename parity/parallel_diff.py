@@ -0,0 +1,119 @@
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+from diff_catalogs import OUTPUT_FILES, generate_ddl
+from incremental import SCHEMA_COLUMNS
+
+# Configuration
+SHARD_DIR = 'ddl_shards'           # One sub-directory of shard files per output
+MANIFEST_NAME = 'manifest.json'
+SHARDS_PER_WORKER = 4              # More shards than workers evens out uneven schemas
+
+def partition_schemas(prod, qa, num_shards, extra_schemas=()):
+    """
+    Assign schemas to shards as contiguous ranges of the sorted schema names,
+    balanced by the number of catalog rows. `extra_schemas` (not in the catalogs)
+    count as one row each. Returns {schema: shard id}.
+    Contiguous ranges keep the concatenated shards in the same order as a serial run.
+    """
+    schema_values = [df[SCHEMA_COLUMNS[kind]] for side in (prod, qa) for kind, df in side.items()]
+    schema_values.append(pd.Series(list(extra_schemas), dtype=object))
+    weights = pd.concat(schema_values, ignore_index=True).value_counts()
+    target = weights.sum() / num_shards
+
+    assignment = {}
+    shard = 0
+    seen = 0
+    for schema in sorted(weights.index):
+        if seen >= target * (shard + 1) and shard < num_shards - 1:
+            shard += 1
+        assignment[schema] = shard
+        seen += weights[schema]
+    return assignment
+
+def split_catalog(catalog, assignment, num_shards):
+    """Split every metadata export by shard. Returns a list of {kind: DataFrame}, one per shard."""
+    shards = [{} for _ in range(num_shards)]
+    for kind, df in catalog.items():
+        positions = df.groupby(df[SCHEMA_COLUMNS[kind]].map(assignment), sort=False).indices
+        for shard_id in range(num_shards):
+            shards[shard_id][kind] = df.iloc[positions.get(shard_id, [])]
+    return shards
+
+def diff_shard(shard_id, prod, qa, shard_dir=SHARD_DIR, reused=None):
+    """
+    Diff one shard of schemas and write its part of each output file. `reused`
+    holds earlier DDL of schemas that weren't re-diffed; it is written to the
+    shard files too, so they cover the same schemas as the merged output.
+    Returns (manifest entry, DDL of the diffed schemas).
+    """
+    ddl = generate_ddl(prod, qa)
+    reused = reused or {}
+    written = {**reused, **ddl}
+    schemas = sorted(written)
+
+    files = {}
+    for output in OUTPUT_FILES:
+        text = ''.join(written[schema].get(output, '') for schema in schemas)
+        if not text:
+            continue
+        path = os.path.join(shard_dir, output, f"shard_{shard_id:04d}.sql")
+        with open(path, 'w') as f:
+            f.write(text)
+        files[output] = path
+
+    return {'shard': shard_id, 'schemas': schemas, 'reused': len(reused), 'files': files}, ddl
+
+def run_parallel(prod, qa, workers, shard_dir=SHARD_DIR, reused=None):
+    """
+    Diff prod against QA across a process pool, one task per shard of schemas.
+    Each task writes its own shard files; a manifest lists them in order.
+    In incremental runs, `reused` is the earlier {schema: {output: ddl text}} of
+    the schemas that weren't re-diffed; the shards include it, so the manifest
+    covers every schema of the merged output files.
+    Returns the same {schema: {output: ddl text}} as generate_ddl, for the diffed schemas.
+    """
+    reused = reused or {}
+    num_shards = workers * SHARDS_PER_WORKER
+    assignment = partition_schemas(prod, qa, num_shards, extra_schemas=reused)
+    prod_shards = split_catalog(prod, assignment, num_shards)
+    qa_shards = split_catalog(qa, assignment, num_shards)
+    reused_shards = [{} for _ in range(num_shards)]
+    for schema, text in reused.items():
+        reused_shards[assignment[schema]][schema] = text
+
+    # Start from a clean shard directory so stale shards never end up in the manifest
+    shutil.rmtree(shard_dir, ignore_errors=True)
+    for output in OUTPUT_FILES:
+        os.makedirs(os.path.join(shard_dir, output), exist_ok=True)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(diff_shard, shard_id, prod_shards[shard_id], qa_shards[shard_id], shard_dir,
+                        reused_shards[shard_id])
+            for shard_id in range(num_shards)
+        ]
+        results = [future.result() for future in futures]
+
+    ddl = {}
+    manifest = {'workers': workers, 'reused_schemas': len(reused),
+                'outputs': {output: [] for output in OUTPUT_FILES}, 'shards': []}
+    for entry, shard_ddl in results:
+        ddl.update(shard_ddl)
+        if not entry['schemas']:
+            continue
+        manifest['shards'].append({'shard': entry['shard'], 'first_schema': entry['schemas'][0],
+                                   'last_schema': entry['schemas'][-1], 'schemas': len(entry['schemas']),
+                                   'reused': entry['reused']})
+        for output, path in entry['files'].items():
+            manifest['outputs'][output].append(path)
+
+    with open(os.path.join(shard_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    print(f"Diffed {len(assignment) - len(reused)} schemas in {num_shards} shards across {workers} workers"
+          + (f", {len(reused)} more reused" if reused else ""))
+    return ddl
@@ -1,103 +1,74 @@
-import pandas as pd
+from load_metadata import load_metadata
+from snapshot_cache import load_cached_metadata
+from diff_catalogs import generate_ddl, write_ddl
+from incremental import load_state, save_state, schema_digests, changed_schemas, filter_catalog
+from parallel_diff import run_parallel
 
-# Load prod metadata
-prod_schemas = pd.read_csv('schemas.csv')
-prod_tables = pd.read_csv('tables.csv')
-prod_columns = pd.read_csv('columns.csv')
-prod_views = pd.read_csv('views.csv')
-prod_materialized_views = pd.read_csv('materialized_views.csv')
+# Stream the (large) columns exports in chunks instead of reading them in one go
+CHUNKED_COLUMNS = True
 
-# Load QA metadata
-qa_schemas = pd.read_csv('qa_schemas.csv')
-qa_tables = pd.read_csv('qa_tables.csv')
-qa_columns = pd.read_csv('qa_columns.csv')
-qa_views = pd.read_csv('qa_views.csv')
-qa_materialized_views = pd.read_csv('qa_materialized_views.csv')
+# Parquet snapshot cache for the metadata CSVs (see snapshot_cache.py)
+USE_SNAPSHOT_CACHE = True
+REBUILD_CACHE = False  # Set to True to re-parse every CSV and refresh its snapshot
 
-# Output files
-with open('create_schemas_qa.sql', 'w') as schema_file, \
-     open('create_tables_qa.sql', 'w') as table_file, \
-     open('create_views_qa.sql', 'w') as view_file, \
-     open('create_materialized_views_qa.sql', 'w') as materialized_view_file, \
-     open('alter_tables_qa.sql', 'w') as alter_file:
+# Only re-diff schemas whose prod/QA catalogs changed since the last run (see incremental.py)
+INCREMENTAL = False
 
-    # Step 1: Create missing schemas
-    missing_schemas = set(prod_schemas['SCHEMA_NAME']) - set(qa_schemas['SCHEMA_NAME'])
-    for schema in missing_schemas:
-        schema_file.write(f"CREATE SCHEMA IF NOT EXISTS {schema};\n")
+# Number of processes diffing schema shards; 1 diffs serially (see parallel_diff.py)
+PARALLEL_WORKERS = 1
 
-    # Step 2: Create missing tables (including external tables)
-    merged_tables = pd.merge(prod_tables, qa_tables, on=['TABLE_SCHEMA', 'TABLE_NAME'], how='outer', indicator=True)
-    
-    # Rename columns to remove _x and _y suffixes
-    merged_tables.rename(columns={
-        'TABLE_TYPE_x': 'TABLE_TYPE'  # Use TABLE_TYPE from prod_tables
-    }, inplace=True)
+# Metadata exports: kind -> (prod file, QA file)
+METADATA_FILES = {
+    'schemas': ('schemas.csv', 'qa_schemas.csv'),
+    'tables': ('tables.csv', 'qa_tables.csv'),
+    'columns': ('columns.csv', 'qa_columns.csv'),
+    'views': ('views.csv', 'qa_views.csv'),
+    'materialized_views': ('materialized_views.csv', 'qa_materialized_views.csv'),
+}
 
-    missing_tables = merged_tables[merged_tables['_merge'] == 'left_only']
+def read_metadata(path, kind, chunked=False):
+    """Load a metadata export, through the snapshot cache if enabled"""
+    if USE_SNAPSHOT_CACHE:
+        return load_cached_metadata(path, kind, chunked=chunked, rebuild=REBUILD_CACHE)
+    return load_metadata(path, kind, chunked=chunked)
 
-    for _, row in missing_tables.iterrows():
-        if row['TABLE_TYPE'] == 'BASE TABLE':
-            # Generate CREATE TABLE statement for base tables
-            table_columns = prod_columns[
-                (prod_columns['TABLE_SCHEMA'] == row['TABLE_SCHEMA']) &
-                (prod_columns['TABLE_NAME'] == row['TABLE_NAME'])
-            ]
-            columns_ddl = []
-            for _, col in table_columns.iterrows():
-                col_def = f"{col['COLUMN_NAME']} {col['DATA_TYPE']}"
-                if col['IS_NULLABLE'] == 'NO':
-                    col_def += " NOT NULL"
-                if 'COLUMN_DEFAULT' in col and pd.notna(col['COLUMN_DEFAULT']):
-                    col_def += f" DEFAULT {col['COLUMN_DEFAULT']}"
-                columns_ddl.append(col_def)
-            
-            create_table_ddl = f"CREATE TABLE IF NOT EXISTS {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} (\n"
-            create_table_ddl += ",\n".join(columns_ddl)
-            create_table_ddl += "\n);"
-            table_file.write(create_table_ddl + "\n\n")
-        
-        elif row['TABLE_TYPE'] == 'EXTERNAL TABLE':
-            # Generate CREATE EXTERNAL TABLE statement
-            table_file.write(f"CREATE EXTERNAL TABLE IF NOT EXISTS {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} ...;\n")
-            # Add external table-specific logic (e.g., location, file format) as needed.
+def load_catalogs():
+    """Load the prod and QA metadata exports as {kind: DataFrame}"""
+    prod, qa = {}, {}
+    for kind, (prod_path, qa_path) in METADATA_FILES.items():
+        chunked = CHUNKED_COLUMNS and kind == 'columns'
+        prod[kind] = read_metadata(prod_path, kind, chunked=chunked)
+        qa[kind] = read_metadata(qa_path, kind, chunked=chunked)
+    return prod, qa
 
-    # Step 3: Create missing views
-    merged_views = pd.merge(prod_views, qa_views, on=['TABLE_SCHEMA', 'TABLE_NAME'], how='outer', indicator=True)
-    missing_views = merged_views[merged_views['_merge'] == 'left_only']
+def diff(prod, qa, reused=None):
+    """
+    Diff prod against QA, serially or across the process pool. `reused` is the
+    earlier DDL of schemas an incremental run doesn't re-diff; the pool writes
+    it to the shard files too
+    """
+    if PARALLEL_WORKERS > 1:
+        return run_parallel(prod, qa, PARALLEL_WORKERS, reused=reused)
+    return generate_ddl(prod, qa)
 
-    for _, row in missing_views.iterrows():
-        create_view_ddl = f"CREATE OR REPLACE VIEW {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} AS {row['VIEW_DEFINITION']};\n"
-        view_file.write(create_view_ddl)
+def main():
+    prod, qa = load_catalogs()
 
-    # Step 4: Create missing materialized views
-    merged_materialized_views = pd.merge(prod_materialized_views, qa_materialized_views, on=['TABLE_SCHEMA', 'TABLE_NAME'], how='outer', indicator=True)
-    missing_materialized_views = merged_materialized_views[merged_materialized_views['_merge'] == 'left_only']
+    if not INCREMENTAL:
+        ddl = diff(prod, qa)
+    else:
+        # Re-diff only the schemas whose catalogs changed and reuse the earlier DDL for the rest
+        digests = schema_digests(prod, qa)
+        state = load_state()
+        changed = changed_schemas(digests, state)
+        print(f"Incremental run: {len(changed)} of {len(digests)} schemas changed")
 
-    for _, row in missing_materialized_views.iterrows():
-        create_materialized_view_ddl = f"CREATE MATERIALIZED VIEW {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} AS ...;\n"
-        materialized_view_file.write(create_materialized_view_ddl)
+        ddl = {schema: text for schema, text in state['ddl'].items() if schema in digests and schema not in changed}
+        ddl.update(diff(filter_catalog(prod, changed), filter_catalog(qa, changed), reused=ddl))
+        save_state(digests, ddl)
 
-    # Step 5: Alter existing tables to add missing columns
-    merged_columns = pd.merge(prod_columns, qa_columns, on=['TABLE_SCHEMA', 'TABLE_NAME', 'COLUMN_NAME'], how='outer', indicator=True)
-    
-    # Rename columns to remove _x and _y suffixes
-    merged_columns.rename(columns={
-        'DATA_TYPE_x': 'DATA_TYPE',
-        'IS_NULLABLE_x': 'IS_NULLABLE',
-        'COLUMN_DEFAULT_x': 'COLUMN_DEFAULT'
-    }, inplace=True)
+    write_ddl(ddl)
+    print("DDL scripts generated successfully!")
 
-    missing_columns = merged_columns[merged_columns['_merge'] == 'left_only']
-
-    for _, row in missing_columns.iterrows():
-        alter_table_ddl = f"ALTER TABLE {row['TABLE_SCHEMA']}.{row['TABLE_NAME']} "
-        alter_table_ddl += f"ADD COLUMN {row['COLUMN_NAME']} {row['DATA_TYPE']}"
-        if row['IS_NULLABLE'] == 'NO':
-            alter_table_ddl += " NOT NULL"
-        if 'COLUMN_DEFAULT' in row and pd.notna(row['COLUMN_DEFAULT']):
-            alter_table_ddl += f" DEFAULT {row['COLUMN_DEFAULT']}"
-        alter_table_ddl += ";\n"
-        alter_file.write(alter_table_ddl)
-
-print("DDL scripts generated successfully!")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+import pandas as pd
+
+from load_metadata import load_metadata, METADATA_COLUMNS
+
+# Configuration
+CACHE_DIR = '.parity_cache'     # Where Parquet snapshots are kept
+MAX_CACHE_ENTRIES = 50          # Least recently used snapshots beyond this are evicted
+HASH_BLOCK_SIZE = 8 * 1024 * 1024
+INDEX_FILE = 'index.json'       # Remembers the content hash of each source file
+
+def file_hash(path):
+    """Return the blake2b hex digest of a file's content, read in blocks"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def load_index(cache_dir):
+    """Load the source file -> (size, mtime, hash) index"""
+    try:
+        with open(os.path.join(cache_dir, INDEX_FILE), 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+def save_index(cache_dir, index):
+    tmp_path = os.path.join(cache_dir, INDEX_FILE + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, os.path.join(cache_dir, INDEX_FILE))
+
+def loader_version(kind):
+    """Return a short hash of the columns and dtypes load_metadata reads for `kind`"""
+    columns = json.dumps(METADATA_COLUMNS[kind], sort_keys=True)
+    return hashlib.blake2b(columns.encode(), digest_size=4).hexdigest()
+
+def snapshot_key(path, kind, cache_dir=CACHE_DIR):
+    """
+    Build the cache key for a metadata CSV from its size, mtime and content hash, plus
+    the loader_version, so snapshots saved before a change to METADATA_COLUMNS are not reused.
+    The content hash is only recomputed when size or mtime changed since it was last recorded.
+    """
+    stat = os.stat(path)
+    source = os.path.abspath(path)
+    index = load_index(cache_dir)
+    entry = index.get(source)
+
+    if entry and entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+        content_hash = entry['hash']
+    else:
+        content_hash = file_hash(path)
+        index[source] = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': content_hash}
+        save_index(cache_dir, index)
+
+    return f"{kind}_{loader_version(kind)}_{stat.st_size}_{stat.st_mtime_ns}_{content_hash}"
+
+def evict_snapshots(cache_dir=CACHE_DIR, max_entries=MAX_CACHE_ENTRIES):
+    """Delete the least recently used snapshots beyond max_entries"""
+    snapshots = [
+        os.path.join(cache_dir, name) for name in os.listdir(cache_dir)
+        if name.endswith('.parquet')
+    ]
+    snapshots.sort(key=os.path.getmtime, reverse=True)
+    for path in snapshots[max_entries:]:
+        os.remove(path)
+        print(f"Evicted cached snapshot {os.path.basename(path)}")
+
+def load_cached_metadata(path, kind, chunked=False, rebuild=False, cache_dir=CACHE_DIR):
+    """
+    Load a metadata export through the Parquet snapshot cache.
+    The CSV is parsed once; later runs read the cached columnar copy
+    until the file changes. rebuild=True forces the CSV to be parsed again.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    snapshot_path = os.path.join(cache_dir, snapshot_key(path, kind, cache_dir) + '.parquet')
+
+    if not rebuild and os.path.exists(snapshot_path):
+        os.utime(snapshot_path)  # Mark as recently used for eviction
+        return pd.read_parquet(snapshot_path)
+
+    df = load_metadata(path, kind, chunked=chunked)
+    tmp_path = snapshot_path + '.tmp'
+    df.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, snapshot_path)
+    print(f"Cached snapshot of {path}")
+
+    evict_snapshots(cache_dir)
+    return df
@@ -1,28 +1,83 @@
+import os
+from sql_statements import iter_statements, terminated
+from statement_cost import DEFAULT_COST_MODEL, estimate_cost, fit_cost_model, balance_chunks
+from statement_store import write_store
+
 # Define the input file and output directory
 input_file = 'create_tables_qa.sql'
 output_dir = 'split_files'  # Directory to store the split files
 queries_per_file = 50  # Number of queries per file
 
-# Create the output directory if it doesn't exist
-import os
-if not os.path.exists(output_dir):
-    os.makedirs(output_dir)
-
-# Read the input file
-with open(input_file, 'r') as file:
-    queries = file.read().split(';\n')  # Split queries by semicolon and newline
-
-# Remove any empty strings from the list
-queries = [query.strip() for query in queries if query.strip()]
-
-# Split queries into chunks of `queries_per_file`
-for i in range(0, len(queries), queries_per_file):
-    chunk = queries[i:i + queries_per_file]
-    file_number = (i // queries_per_file) + 1  # File numbering starts from 1
-    output_file = os.path.join(output_dir, f'file{file_number}.sql')
-    
-    # Write the chunk to the output file
-    with open(output_file, 'w') as outfile:
-        outfile.write(';\n'.join(chunk) + ';\n')  # Add semicolon and newline after each query
-
-print(f"Split {len(queries)} queries into {file_number} files in '{output_dir}'.")
+# Chunking mode: 'count' writes `queries_per_file` queries per file,
+# 'cost' bin-packs queries into `num_chunks` files of roughly equal estimated run time
+chunking = 'count'
+num_chunks = 16
+timing_log = None  # JSONL timing log of earlier runs to tune the cost model, e.g. 'statement_timings.jsonl'
+
+# Output format: 'files' writes fileN.sql per chunk, 'store' writes one statement
+# store plus a byte-offset manifest (see statement_store.py)
+output_format = 'files'
+
+def chunk_by_count():
+    """Stream (chunk id, query) pairs with `queries_per_file` queries per chunk"""
+    for position, query in enumerate(iter_statements(input_file)):
+        yield position // queries_per_file, query
+
+def chunk_by_cost():
+    """
+    Bin-pack queries into `num_chunks` chunks of roughly equal estimated cost.
+    The first pass only keeps one cost per query; the second pass streams the
+    queries again with their chunk id, keeping input order within a chunk.
+    """
+    model = fit_cost_model(timing_log) if timing_log else DEFAULT_COST_MODEL
+    costs = [estimate_cost(query, model) for query in iter_statements(input_file)]
+    assignment = balance_chunks(costs, num_chunks)
+
+    chunk_costs = [0.0] * num_chunks
+    for position, cost in enumerate(costs):
+        chunk_costs[assignment[position]] += cost
+    if costs:
+        print(f"Estimated chunk cost: min {min(chunk_costs):.1f}s, max {max(chunk_costs):.1f}s")
+
+    for position, query in enumerate(iter_statements(input_file)):
+        yield assignment[position], query
+
+def write_files(assigned, sequential, directory=None):
+    """
+    Write (chunk id, query) pairs into fileN.sql files, numbered from 1, in
+    `directory` (default `output_dir`). With sequential chunk ids only one file
+    is open at a time. Returns (query count, file count).
+    """
+    directory = directory or output_dir
+    query_count = 0
+    chunks = set()
+    outfiles = {}
+    try:
+        for chunk, query in assigned:
+            if chunk not in outfiles:
+                chunks.add(chunk)
+                if sequential:
+                    for outfile in outfiles.values():
+                        outfile.close()
+                    outfiles = {}
+                outfiles[chunk] = open(os.path.join(directory, f'file{chunk + 1}.sql'), 'w')
+            outfiles[chunk].write(terminated(query))  # Add semicolon and newline after each query
+            query_count += 1
+    finally:
+        for outfile in outfiles.values():
+            outfile.close()
+    return query_count, len(chunks)
+
+if __name__ == "__main__":
+    # Create the output directory if it doesn't exist
+    if not os.path.exists(output_dir):
+        os.makedirs(output_dir)
+
+    assigned = chunk_by_cost() if chunking == 'cost' else chunk_by_count()
+
+    if output_format == 'store':
+        query_count, chunk_count = write_store(assigned, output_dir)
+        print(f"Stored {query_count} queries in {chunk_count} chunks in '{output_dir}'.")
+    else:
+        query_count, file_count = write_files(assigned, sequential=(chunking != 'cost'))
+        print(f"Split {query_count} queries into {file_count} files in '{output_dir}'.")
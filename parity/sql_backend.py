@@ -0,0 +1,364 @@
+import itertools
+import random
+import re
+import sqlite3
+import threading
+import time
+
+from sql_statements import IDENTIFIER, TARGET, statement_kind, split_name, LEADING_COMMENTS, LIST_TOKENS
+from ddl_scheduler import table_references
+
+# Snowflake error numbers the local backend reproduces
+ALREADY_EXISTS = 2002
+DOES_NOT_EXIST = 2003
+COMPILATION_ERROR = 1003
+
+ARROW_BATCH_ROWS = 100_000  # Rows per batch from LocalSession.fetch_arrow_batches
+
+class StatementError(Exception):
+    """A statement the backend rejected, with its error number and query id when known"""
+
+    def __init__(self, message, errno=None, query_id=None):
+        super().__init__(message)
+        self.errno = errno
+        self.query_id = query_id
+
+class SnowflakeBackend:
+    """Sessions on a Snowflake account; connect_args go to snowflake.connector.connect"""
+
+    def __init__(self, **connect_args):
+        self.connect_args = connect_args
+
+    def connect(self):
+        # Imported here so the local backend works without the Snowflake connector
+        import snowflake.connector
+        return SnowflakeSession(snowflake.connector.connect(**self.connect_args))
+
+class SnowflakeSession:
+    """One connection and cursor. execute() raises StatementError for SQL errors"""
+
+    def __init__(self, conn):
+        from snowflake.connector import ProgrammingError
+        self.programming_error = ProgrammingError
+        self.conn = conn
+        self.cursor = conn.cursor()
+        self.rowcount = None
+        self.query_id = None
+
+    def execute(self, sql):
+        try:
+            self.cursor.execute(sql)
+        except self.programming_error as e:
+            raise StatementError(str(e), e.errno, e.sfqid) from e
+        self.rowcount = self.cursor.rowcount
+        self.query_id = self.cursor.sfqid
+        return self
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def fetch_arrow_batches(self):
+        """Stream the result as pyarrow Tables, one per result chunk, without building Python rows"""
+        return self.cursor.fetch_arrow_batches()
+
+    def close(self):
+        self.cursor.close()
+        self.conn.close()
+
+ROLE = re.compile(rf"\bTO\s+ROLE\s+({IDENTIFIER})", re.I)
+ON_SCHEMA = re.compile(rf"\bON\s+(?:(?:ALL|FUTURE)\s+\w+\s+IN\s+)?SCHEMA\s+({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER})?)", re.I)
+ON_OBJECT = re.compile(rf"\bON\s+(?:TABLE|VIEW|EXTERNAL\s+TABLE|MATERIALIZED\s+VIEW)\s+({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}})", re.I)
+ADD_COLUMN = re.compile(r"\bADD\s+COLUMN\s+", re.I)
+ALTER_COLUMN = re.compile(rf"\bALTER\s+COLUMN\s+({IDENTIFIER})", re.I)
+USE = re.compile(rf"USE\s+(DATABASE|SCHEMA)\s+({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER})?)\s*\Z", re.I)
+
+def split_top_level(text):
+    """Split a comma-separated list, ignoring commas inside parentheses, strings, quoted names and comments"""
+    parts = []
+    depth = 0
+    start = 0
+    for token in LIST_TOKENS.finditer(text):
+        char = token.group()
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == ',' and depth == 0:
+            parts.append(text[start:token.start()])
+            start = token.end()
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+class LocalBackend:
+    """
+    SQLite stand-in for Snowflake, for testing and benchmarking executors offline.
+    Understands the DDL and GRANT subset the parity and ownership scripts generate
+    (schemas, tables, external tables, views, ALTER TABLE, GRANT, USE, SHOW ROLES)
+    by keeping the catalog in information_schema.schemata/tables/columns/grants,
+    which SELECTs can query. Object bodies are not executed, so Snowflake-only
+    SQL in view definitions is accepted. Errors use Snowflake's error numbers.
+    Each statement sleeps `latency` (+ up to `jitter`) seconds outside the database
+    lock, so concurrent sessions overlap like remote ones, and fails with
+    `failure_errno` at rate `failure_rate`. With `roles` set, grants to other roles fail;
+    `schemas` lists schemas that already exist, like the target database's, and
+    `path` keeps the catalog in a SQLite file so it survives between runs.
+    """
+
+    def __init__(self, path=':memory:', latency=0.0, jitter=0.0, failure_rate=0.0,
+                 failure_errno=625, roles=None, schemas=(), seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.failure_errno = failure_errno
+        self.roles = {role.upper() for role in roles} if roles is not None else None
+        self.random = random.Random(seed)
+        self.query_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(':memory:', check_same_thread=False, isolation_level=None)
+        self.db.execute("ATTACH DATABASE ? AS information_schema", (path,))
+        self.db.execute("PRAGMA information_schema.synchronous = OFF")  # A test catalog, not worth an fsync per statement
+        self.db.execute("CREATE TABLE IF NOT EXISTS information_schema.schemata (schema_name TEXT PRIMARY KEY)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS information_schema.tables "
+                        "(table_schema TEXT, table_name TEXT, table_type TEXT, table_owner TEXT, PRIMARY KEY (table_schema, table_name))")
+        self.db.execute("CREATE TABLE IF NOT EXISTS information_schema.columns "
+                        "(table_schema TEXT, table_name TEXT, column_name TEXT, ordinal_position INTEGER, definition TEXT)")
+        self.db.execute("CREATE INDEX IF NOT EXISTS information_schema.columns_by_table ON columns (table_schema, table_name)")
+        self.db.execute("CREATE TABLE IF NOT EXISTS information_schema.grants "
+                        "(privilege TEXT, object_name TEXT, grantee TEXT)")
+        self.db.executemany("INSERT OR IGNORE INTO information_schema.schemata VALUES (?)", [(schema.upper(),) for schema in schemas])
+
+    def connect(self):
+        return LocalSession(self)
+
+class LocalSession:
+    """A session on a LocalBackend, tracking its own current database and schema"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.database = None
+        self.schema = None
+        self.rowcount = None
+        self.query_id = None
+        self.rows = []
+        self.columns = []
+
+    def execute(self, sql):
+        backend = self.backend
+        self.query_id = f"local-{next(backend.query_ids)}"
+        self.rowcount = None
+        self.rows = []
+        self.columns = []
+        with backend.lock:
+            delay = backend.latency + backend.random.random() * backend.jitter
+            fail = backend.random.random() < backend.failure_rate
+        if delay:
+            time.sleep(delay)
+        if fail:
+            self.fail(backend.failure_errno, "Injected failure")
+        with backend.lock:
+            self.run(sql)
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def fetch_arrow_batches(self):
+        """Yield a SELECT result as pyarrow Tables of up to ARROW_BATCH_ROWS rows, like the Snowflake connector"""
+        import pyarrow as pa
+        for start in range(0, len(self.rows), ARROW_BATCH_ROWS):
+            chunk = self.rows[start:start + ARROW_BATCH_ROWS]
+            yield pa.table({name: [row[position] for row in chunk] for position, name in enumerate(self.columns)})
+
+    def close(self):
+        pass
+
+    def fail(self, errno, message):
+        raise StatementError(f"{errno:06d} ({self.query_id}): {message}", errno, self.query_id)
+
+    def query(self, sql, parameters=()):
+        """Run SQL on the catalog database; SQLite errors become compilation errors"""
+        try:
+            return self.backend.db.execute(sql, parameters).fetchall()
+        except sqlite3.Error as e:
+            self.fail(COMPILATION_ERROR, f"SQL compilation error: {e}")
+
+    def select(self, sql):
+        """Run a SELECT on the catalog database; returns (column names, rows)"""
+        try:
+            cursor = self.backend.db.execute(sql)
+            return [column[0] for column in cursor.description], cursor.fetchall()
+        except sqlite3.Error as e:
+            self.fail(COMPILATION_ERROR, f"SQL compilation error: {e}")
+
+    def qualify(self, parts):
+        """Resolve split name parts to (schema, name), defaulting to the session's schema"""
+        if len(parts) >= 2:
+            return parts[-2], parts[-1]
+        if self.schema is None:
+            self.fail(DOES_NOT_EXIST, "Cannot perform operation. This session does not have a current schema.")
+        return self.schema, parts[-1]
+
+    def target(self, body):
+        """Match the object a CREATE/ALTER statement targets"""
+        match = TARGET.match(body)
+        if match is None:
+            self.fail(COMPILATION_ERROR, f"Statement not supported by the local backend: {body[:80]}")
+        return match
+
+    def require_schema(self, schema):
+        if not self.query("SELECT 1 FROM information_schema.schemata WHERE schema_name = ?", (schema,)):
+            self.fail(DOES_NOT_EXIST, f"SQL compilation error: Schema '{schema}' does not exist or not authorized.")
+
+    def object_type(self, schema, name):
+        rows = self.query("SELECT table_type FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+                          (schema, name))
+        return rows[0][0] if rows else None
+
+    def require_object(self, schema, name):
+        object_type = self.object_type(schema, name)
+        if object_type is None:
+            self.fail(DOES_NOT_EXIST, f"SQL compilation error: Object '{schema}.{name}' does not exist or not authorized.")
+        return object_type
+
+    def run(self, sql):
+        body = sql[LEADING_COMMENTS.match(sql).end():].strip().rstrip(';').strip()
+        upper = body.upper()
+        kind = statement_kind(body)
+
+        use = USE.match(body)
+        if use:
+            parts = split_name(use.group(2))
+            if use.group(1).upper() == 'DATABASE':
+                self.database, self.schema = parts[-1], None
+            else:
+                self.require_schema(parts[-1])
+                self.schema = parts[-1]
+        elif upper.startswith('SHOW ROLES'):
+            self.rows = [(None, role) for role in sorted(self.backend.roles or ())]
+        elif kind == 'create_schema':
+            self.create_schema(body, upper)
+        elif kind in ('create_table', 'create_external_table', 'create_view', 'create_materialized_view'):
+            self.create_object(body, upper, kind)
+        elif kind == 'alter_table':
+            self.alter_table(body)
+        elif kind == 'grant':
+            self.grant(body)
+        elif upper.startswith('SELECT'):
+            self.columns, self.rows = self.select(body)
+            self.rowcount = len(self.rows)
+        else:
+            self.fail(COMPILATION_ERROR, f"Statement not supported by the local backend: {body[:80]}")
+        if self.rowcount is None:
+            self.rowcount = 1
+
+    def create_schema(self, body, upper):
+        schema = split_name(self.target(body).group(1))[-1]
+        exists = self.query("SELECT 1 FROM information_schema.schemata WHERE schema_name = ?", (schema,))
+        if exists and 'OR REPLACE' not in upper and 'IF NOT EXISTS' not in upper:
+            self.fail(ALREADY_EXISTS, f"SQL compilation error: Object '{schema}' already exists.")
+        self.query("INSERT OR IGNORE INTO information_schema.schemata VALUES (?)", (schema,))
+
+    def create_object(self, body, upper, kind):
+        match = self.target(body)
+        schema, name = self.qualify(split_name(match.group(1)))
+        self.require_schema(schema)
+        existing = self.object_type(schema, name)
+        if existing is not None:
+            if 'IF NOT EXISTS' in upper[:match.end()]:
+                return
+            if 'OR REPLACE' not in upper[:match.end()]:
+                self.fail(ALREADY_EXISTS, f"SQL compilation error: Object '{schema}.{name}' already exists.")
+            self.drop_object(schema, name)
+
+        rest = body[match.end():]
+        columns = []
+        if kind == 'create_external_table':
+            # External table bodies are location/format options; model the VALUE column
+            columns = ['VALUE VARIANT']
+            table_type = 'EXTERNAL TABLE'
+        elif kind == 'create_table':
+            if '(' in rest:
+                columns = split_top_level(rest[rest.index('(') + 1:rest.rindex(')')])
+            table_type = 'BASE TABLE'
+        else:
+            # Like Snowflake, a view can only be created once the objects it reads exist
+            for reference in sorted(table_references(body, schema)):
+                self.require_object(*reference)
+            table_type = 'MATERIALIZED VIEW' if kind == 'create_materialized_view' else 'VIEW'
+
+        self.query("INSERT INTO information_schema.tables (table_schema, table_name, table_type) VALUES (?, ?, ?)",
+                   (schema, name, table_type))
+        self.add_columns(schema, name, columns, 1)
+
+    def drop_object(self, schema, name):
+        for table in ('tables', 'columns'):
+            self.query(f"DELETE FROM information_schema.{table} WHERE table_schema = ? AND table_name = ?", (schema, name))
+
+    def add_columns(self, schema, name, definitions, first_position):
+        self.backend.db.executemany(
+            "INSERT INTO information_schema.columns VALUES (?, ?, ?, ?, ?)",
+            [(schema, name, split_name(definition)[0], position, definition)
+             for position, definition in enumerate(definitions, start=first_position)]
+        )
+
+    def alter_table(self, body):
+        match = self.target(body)
+        schema, name = self.qualify(split_name(match.group(1)))
+        self.require_object(schema, name)
+        rest = body[match.end():].strip()
+        columns = {column for (column,) in self.query(
+            "SELECT column_name FROM information_schema.columns WHERE table_schema = ? AND table_name = ?",
+            (schema, name))}
+
+        add = ADD_COLUMN.match(rest)
+        if add:
+            # Snowflake adds all columns or none
+            definitions = split_top_level(rest[add.end():])
+            for definition in definitions:
+                column = split_name(definition)[0]
+                if column in columns:
+                    self.fail(ALREADY_EXISTS, f"SQL compilation error: column '{column}' already exists")
+                columns.add(column)
+            self.add_columns(schema, name, definitions, len(columns) - len(definitions) + 1)
+            return
+
+        alter = ALTER_COLUMN.search(rest)
+        if alter and split_name(alter.group(1))[0] not in columns:
+            self.fail(DOES_NOT_EXIST, f"SQL compilation error: invalid identifier '{alter.group(1)}'")
+        # Other ALTERs (types, nullability, comments) don't change the local model
+
+    def grant(self, body):
+        role = ROLE.search(body)
+        if role is None:
+            self.fail(COMPILATION_ERROR, f"Grant not supported by the local backend: {body[:80]}")
+        role = split_name(role.group(1))[0]
+        if self.backend.roles is not None and role not in self.backend.roles:
+            self.fail(DOES_NOT_EXIST, f"SQL compilation error: Role '{role}' does not exist or not authorized.")
+
+        privilege = body[len('GRANT'):].strip().split()[0].upper()
+        on_object = ON_OBJECT.search(body)
+        on_schema = ON_SCHEMA.search(body)
+        if on_object:
+            schema, name = self.qualify(split_name(on_object.group(1)))
+            self.require_object(schema, name)
+            objects = [f"{schema}.{name}"]
+            if privilege == 'OWNERSHIP':
+                self.query("UPDATE information_schema.tables SET table_owner = ? WHERE table_schema = ? AND table_name = ?",
+                           (role, schema, name))
+        elif on_schema:
+            schema = split_name(on_schema.group(1))[-1]
+            self.require_schema(schema)
+            if re.search(r"\bON\s+ALL\s+TABLES\b", body, re.I):
+                objects = [f"{schema}.{table}" for (table,) in self.query(
+                    "SELECT table_name FROM information_schema.tables "
+                    "WHERE table_schema = ? AND table_type = 'BASE TABLE'", (schema,))]
+                if privilege == 'OWNERSHIP':
+                    self.query("UPDATE information_schema.tables SET table_owner = ? "
+                               "WHERE table_schema = ? AND table_type = 'BASE TABLE'", (role, schema))
+            else:
+                objects = [schema]
+        else:
+            objects = [None]
+        for object_name in objects:
+            self.query("INSERT INTO information_schema.grants VALUES (?, ?, ?)", (privilege, object_name, role))
+        self.rowcount = len(objects)
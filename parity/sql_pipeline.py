@@ -0,0 +1,169 @@
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from sql_statements import IDENTIFIER, iter_statements, statement_kind, normalize, terminated
+from double_quotes import quote_column_names
+from split_file import write_files
+from statement_store import write_store
+
+# Source dump, read once
+input_file = 'create_tables_qa.sql'
+
+# Transforms, applied in this order to every statement
+quote_identifiers = True   # Double-quote CREATE TABLE column names (see double_quotes.py)
+database_map = {}          # Rename databases, e.g. {'PROD_DB': 'QA_DB'}
+schema_map = {}            # Rename schemas, e.g. {'SALES': 'SALES_QA'}
+keep_kinds = None          # Only keep these statement kinds (see sql_statements.STATEMENT_KINDS), e.g. {'create_table'}; None keeps all
+
+# Sinks; set either to None to skip it
+output_file = 'output.sql'        # Single transformed file
+output_dir = 'split_files'        # Split chunks, `queries_per_file` statements each
+queries_per_file = 50
+output_format = 'files'           # 'files' (fileN.sql) or 'store' (see statement_store.py)
+
+# Transforms run in a process pool over batches of statements; 1 runs them inline
+processes = os.cpu_count() or 1
+batch_size = 2000
+
+# Tokens the name rewriter looks at: 'strings' and comments are skipped whole;
+# names are optionally preceded by DATABASE/SCHEMA, which says what a short name is
+NAME_TOKENS = re.compile(
+    rf"""'(?:[^'\\]|\\.|'')*'?|--[^\n]*|/\*.*?(?:\*/|\Z)"""
+    rf"|(?:\b(DATABASE|SCHEMA)\s+(?:IF\s+(?:NOT\s+)?EXISTS\s+)?)?({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}})",
+    re.I | re.S
+)
+NAME_PARTS = re.compile(IDENTIFIER)
+
+def rewrite_names(statement, database_map, schema_map):
+    """
+    Rename databases and schemas in qualified names (db.schema.name, schema.name)
+    and after DATABASE/SCHEMA keywords (USE SCHEMA s, CREATE SCHEMA db.s, ...).
+    Map keys match the way Snowflake resolves names, so unquoted names match in any case.
+    Two-part names are read as schema.name, so an alias.column whose alias equals a
+    mapped schema name is renamed too.
+    """
+    upper = statement.upper()
+    if not any(name.upper() in upper for name in (*database_map, *schema_map)):
+        return statement  # Cheap check: nothing to rename
+
+    def rename(match):
+        keyword, name = match.group(1), match.group(2)
+        if name is None:
+            return match.group(0)  # String or comment
+        parts = NAME_PARTS.findall(name)
+        if keyword is None and len(parts) == 1:
+            return match.group(0)  # Unqualified object or column name
+        # Role of each part, counted from the end of the name
+        if keyword and keyword.upper() == 'DATABASE':
+            roles = ['database']
+        elif keyword:
+            roles = ['database', 'schema'][-len(parts):]
+        else:
+            roles = ['database', 'schema', None][-len(parts):]
+        roles = [None] * (len(parts) - len(roles)) + roles
+
+        renamed = []
+        for part, role in zip(parts, roles):
+            mapping = database_map if role == 'database' else schema_map if role == 'schema' else {}
+            renamed.append(mapping.get(normalize(part), part))
+        if renamed == parts:
+            return match.group(0)
+        return match.group(0)[:match.start(2) - match.start()] + '.'.join(renamed)
+
+    return NAME_TOKENS.sub(rename, statement)
+
+def keep_kind(statement, kinds):
+    """Drop statements whose kind is not in `kinds`"""
+    return statement if statement_kind(statement) in kinds else None
+
+def build_transforms():
+    """Transforms from the configuration above, as picklable callables statement -> statement or None"""
+    transforms = []
+    if keep_kinds is not None:
+        transforms.append(partial(keep_kind, kinds=set(keep_kinds)))  # Filter first so dropped statements cost nothing
+    if database_map or schema_map:
+        transforms.append(partial(
+            rewrite_names,
+            database_map={normalize(name): new for name, new in database_map.items()},
+            schema_map={normalize(name): new for name, new in schema_map.items()},
+        ))
+    if quote_identifiers:
+        transforms.append(quote_column_names)
+    return transforms
+
+def apply_transforms(statements, transforms):
+    """Run a batch of statements through the transforms; a transform returning None drops the statement"""
+    results = []
+    for statement in statements:
+        for transform in transforms:
+            statement = transform(statement)
+            if statement is None:
+                break
+        else:
+            results.append(statement)
+    return results
+
+def iter_batches(statements, size):
+    batch = []
+    for statement in statements:
+        batch.append(statement)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def run_pipeline(statements, transforms, processes=1, batch_size=batch_size):
+    """
+    Yield the transformed statements in input order. With more than one process,
+    batches are transformed in a process pool; at most two batches per process
+    are in flight, and results are yielded in submission order, so memory stays
+    bounded while the reader, the workers and the sinks overlap.
+    """
+    if not transforms:
+        yield from statements
+        return
+    if processes <= 1:
+        for batch in iter_batches(statements, batch_size):
+            yield from apply_transforms(batch, transforms)
+        return
+
+    with ProcessPoolExecutor(processes) as pool:
+        pending = deque()
+        for batch in iter_batches(statements, batch_size):
+            pending.append(pool.submit(apply_transforms, batch, transforms))
+            if len(pending) >= processes * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def tee_file(statements, path):
+    """Write each statement to a single SQL file while passing it on"""
+    with open(path, 'w') as outfile:
+        for statement in statements:
+            outfile.write(terminated(statement))
+            yield statement
+
+def main():
+    statements = run_pipeline(iter_statements(input_file), build_transforms(), processes, batch_size)
+    if output_file:
+        statements = tee_file(statements, output_file)
+
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+        assigned = ((position // queries_per_file, statement) for position, statement in enumerate(statements))
+        if output_format == 'store':
+            count, chunk_count = write_store(assigned, output_dir)
+        else:
+            count, chunk_count = write_files(assigned, sequential=True, directory=output_dir)
+        print(f"Wrote {count} statements in {chunk_count} chunks to '{output_dir}'.")
+    else:
+        count = sum(1 for _ in statements)
+    if output_file:
+        print(f"Wrote {count} statements to {output_file}.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,246 @@
+import re
+
+# Characters read from the input per step; memory stays bounded by this plus the largest statement
+BUFFER_SIZE = 1024 * 1024
+
+# Scanner states
+NORMAL, SINGLE_QUOTE, DOUBLE_QUOTE, LINE_COMMENT, BLOCK_COMMENT, DOLLAR_QUOTE = range(6)
+
+# Characters that can start a string, comment, dollar-quote or end a statement
+SPECIAL_CHARS = re.compile(r"[;'\"$/-]")
+SINGLE_QUOTE_CHARS = re.compile(r"['\\]")
+
+def iter_statements(source, buffer_size=BUFFER_SIZE):
+    """
+    Stream SQL statements from a file path or file object, reading fixed-size buffers.
+    Statements are split on top-level semicolons only; semicolons inside
+    'strings', "identifiers", -- comments, /* comments */ and $$ bodies $$ are kept.
+    Yields each statement stripped and without its terminating semicolon;
+    statements made only of comments/whitespace are skipped.
+    """
+    infile = open(source, 'r') if isinstance(source, str) else source
+    try:
+        yield from _scan(infile, buffer_size)
+    finally:
+        if infile is not source:
+            infile.close()
+
+def _scan(infile, buffer_size):
+    state = NORMAL
+    parts = []          # Pieces of the current statement
+    has_code = False    # Whether the current statement has anything besides comments
+    buf = ''
+
+    while True:
+        data = infile.read(buffer_size)
+        eof = not data
+        buf += data
+        n = len(buf)
+        i = start = 0
+
+        while i < n:
+            if state == NORMAL:
+                match = SPECIAL_CHARS.search(buf, i)
+                j = match.start() if match else n
+                if not has_code and buf[i:j].strip():
+                    has_code = True
+                if not match:
+                    i = n
+                    break
+
+                char = buf[j]
+                if char == ';':
+                    parts.append(buf[start:j])
+                    if has_code:
+                        yield ''.join(parts).strip()
+                    parts, has_code = [], False
+                    i = start = j + 1
+                elif char == "'":
+                    state, has_code, i = SINGLE_QUOTE, True, j + 1
+                elif char == '"':
+                    state, has_code, i = DOUBLE_QUOTE, True, j + 1
+                else:
+                    # '-', '/' and '$' only matter as the first half of a two-character token
+                    if j + 1 >= n and not eof:
+                        i = j
+                        break
+                    pair = buf[j:j + 2]
+                    if pair == '--':
+                        state, i = LINE_COMMENT, j + 2
+                    elif pair == '/*':
+                        state, i = BLOCK_COMMENT, j + 2
+                    elif pair == '$$':
+                        state, has_code, i = DOLLAR_QUOTE, True, j + 2
+                    else:
+                        has_code, i = True, j + 1
+
+            elif state == SINGLE_QUOTE:
+                match = SINGLE_QUOTE_CHARS.search(buf, i)
+                if not match:
+                    i = n
+                    break
+                j = match.start()
+                if j + 1 >= n and not eof:
+                    i = j
+                    break
+                if buf[j] == '\\':
+                    i = j + 2  # Backslash escape
+                elif buf[j + 1:j + 2] == "'":
+                    i = j + 2  # Doubled quote
+                else:
+                    state, i = NORMAL, j + 1
+
+            elif state == DOUBLE_QUOTE:
+                j = buf.find('"', i)
+                if j < 0:
+                    i = n
+                    break
+                if j + 1 >= n and not eof:
+                    i = j
+                    break
+                if buf[j + 1:j + 2] == '"':
+                    i = j + 2  # Doubled quote
+                else:
+                    state, i = NORMAL, j + 1
+
+            elif state == LINE_COMMENT:
+                j = buf.find('\n', i)
+                if j < 0:
+                    i = n
+                    break
+                state, i = NORMAL, j + 1
+
+            else:
+                terminator = '*/' if state == BLOCK_COMMENT else '$$'
+                j = buf.find(terminator, i)
+                if j < 0:
+                    # Keep the last character in case the terminator straddles two buffers
+                    i = n if eof else max(i, n - 1)
+                    break
+                state, i = NORMAL, j + 2
+
+        # Move what was scanned into the current statement and carry the rest over
+        parts.append(buf[start:i])
+        buf = buf[i:]
+        if eof:
+            break
+
+    parts.append(buf)
+    if has_code:
+        yield ''.join(parts).strip()
+
+# Leading keywords -> statement kind, checked in order
+STATEMENT_KINDS = [
+    ('CREATE SCHEMA', 'create_schema'),
+    ('CREATE EXTERNAL TABLE', 'create_external_table'),
+    ('CREATE OR REPLACE EXTERNAL TABLE', 'create_external_table'),
+    ('CREATE TABLE', 'create_table'),
+    ('CREATE OR REPLACE TABLE', 'create_table'),
+    ('CREATE MATERIALIZED VIEW', 'create_materialized_view'),
+    ('CREATE OR REPLACE MATERIALIZED VIEW', 'create_materialized_view'),
+    ('CREATE SECURE MATERIALIZED VIEW', 'create_materialized_view'),
+    ('CREATE OR REPLACE SECURE MATERIALIZED VIEW', 'create_materialized_view'),
+    ('CREATE VIEW', 'create_view'),
+    ('CREATE OR REPLACE VIEW', 'create_view'),
+    ('CREATE SECURE VIEW', 'create_view'),
+    ('CREATE OR REPLACE SECURE VIEW', 'create_view'),
+    ('ALTER TABLE', 'alter_table'),
+    ('GRANT ', 'grant'),
+    ('USE ', 'use'),
+]
+
+LEADING_COMMENTS = re.compile(r"\A(?:\s+|--[^\n]*(?:\n|\Z)|/\*.*?\*/)*", re.S)
+ADD_COLUMN_LIST = re.compile(r"ALTER\s+TABLE\s+\S+\s+ADD\s+COLUMN\s+", re.I)
+# Tokens the column list scanners look at: parentheses, commas, and whole 'strings',
+# "identifiers" and comments, so the commas and parentheses inside them are skipped in one step
+LIST_TOKENS = re.compile(r"""[(),]|'(?:[^'\\]|\\.|'')*'?|"(?:[^"]|"")*"?|--[^\n]*|/\*.*?(?:\*/|\Z)""", re.S)
+
+IDENTIFIER = r'(?:"(?:[^"]|"")+"|[A-Za-z_][\w$]*)'
+
+# Object a CREATE/ALTER statement targets, e.g. "CREATE OR REPLACE VIEW s.v AS ..."
+TARGET = re.compile(
+    r"(?:CREATE|ALTER)\s+(?:OR\s+REPLACE\s+)?(?:SECURE\s+)?(?:EXTERNAL\s+|MATERIALIZED\s+)?"
+    rf"(?:SCHEMA|TABLE|VIEW)\s+(?:IF\s+NOT\s+EXISTS\s+)?({IDENTIFIER}(?:\s*\.\s*{IDENTIFIER}){{0,2}})",
+    re.I
+)
+
+# 'strings' and comments, or "quoted identifiers" to keep as they are
+LITERALS = re.compile(r"""'(?:[^'\\]|\\.|'')*'?|--[^\n]*|/\*.*?(?:\*/|\Z)|("(?:[^"]|"")*"?)""", re.S)
+
+def statement_kind(statement):
+    """Classify a statement by its leading keywords, e.g. 'create_table' or 'alter_table'"""
+    offset = LEADING_COMMENTS.match(statement).end()
+    head = ' '.join(statement[offset:offset + 64].upper().split())
+    for prefix, kind in STATEMENT_KINDS:
+        if head.startswith(prefix):
+            return kind
+    return 'other'
+
+def column_count(statement):
+    """
+    Count the column definitions in the first top-level parenthesized list of a
+    statement, or in the column list of an ALTER TABLE ... ADD COLUMN.
+    Commas and parentheses inside 'strings', "identifiers" and comments don't count.
+    """
+    match = ADD_COLUMN_LIST.match(statement, LEADING_COMMENTS.match(statement).end())
+    if match:
+        depth = 0
+        count = 1
+        for token in LIST_TOKENS.finditer(statement, match.end()):
+            char = token.group()
+            if char == '(':
+                depth += 1
+            elif char == ')':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                count += 1
+        return count
+
+    depth = 0
+    count = 0
+    for token in LIST_TOKENS.finditer(statement):
+        char = token.group()
+        if char == '(':
+            depth += 1
+            if depth == 1:
+                count = 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return count
+        elif char == ',' and depth == 1:
+            count += 1
+    return count
+
+def normalize(identifier):
+    """Snowflake resolves unquoted identifiers in upper case and quoted ones as written"""
+    if identifier.startswith('"'):
+        return identifier[1:-1].replace('""', '"')
+    return identifier.upper()
+
+def split_name(name):
+    """Split a possibly qualified name into its normalized parts"""
+    return [normalize(part) for part in re.findall(IDENTIFIER, name)]
+
+def statement_target(statement):
+    """Return (schema, name) of the object a statement creates or alters; schema statements give (name, None)"""
+    body = statement[LEADING_COMMENTS.match(statement).end():]
+    match = TARGET.match(body)
+    if not match:
+        return None, None
+    parts = split_name(match.group(1))
+    if statement_kind(statement) == 'create_schema':
+        return parts[-1], None
+    if len(parts) < 2:
+        return None, parts[-1]
+    return parts[-2], parts[-1]
+
+def strip_literals(sql):
+    """Blank out 'strings' and comments, so names are only matched in SQL text"""
+    return LITERALS.sub(lambda match: match.group(1) or ' ', sql)
+
+def terminated(statement):
+    """Return a statement with its ';', on a line of its own when the last line may end in a -- comment"""
+    if '--' in statement[statement.rfind('\n') + 1:]:
+        return statement + '\n;\n'
+    return statement + ';\n'
@@ -0,0 +1,74 @@
+import heapq
+import json
+import numpy as np
+
+from sql_statements import statement_kind, column_count
+
+# Estimated seconds per statement: base + per_column * columns + per_kb * kilobytes
+DEFAULT_COST_MODEL = {
+    'create_schema': {'base': 0.3, 'per_column': 0.0, 'per_kb': 0.0},
+    'create_table': {'base': 0.5, 'per_column': 0.02, 'per_kb': 0.01},
+    'create_external_table': {'base': 1.0, 'per_column': 0.02, 'per_kb': 0.01},
+    'create_view': {'base': 0.5, 'per_column': 0.0, 'per_kb': 0.05},
+    'create_materialized_view': {'base': 2.0, 'per_column': 0.0, 'per_kb': 0.05},
+    'alter_table': {'base': 0.2, 'per_column': 0.02, 'per_kb': 0.0},
+    'grant': {'base': 0.2, 'per_column': 0.0, 'per_kb': 0.0},
+    'use': {'base': 0.05, 'per_column': 0.0, 'per_kb': 0.0},
+    'other': {'base': 0.5, 'per_column': 0.0, 'per_kb': 0.01},
+}
+
+MIN_SAMPLES = 5  # Timings needed before a statement kind's parameters are re-fitted
+
+def statement_features(statement):
+    """Return (kind, column count, size in KB) of a statement"""
+    kind = statement_kind(statement)
+    columns = column_count(statement) if kind in ('create_table', 'create_external_table', 'alter_table') else 0
+    return kind, columns, len(statement.encode()) / 1024
+
+def estimate_cost(statement, model=DEFAULT_COST_MODEL):
+    """Estimate how long a statement takes to run, in seconds"""
+    kind, columns, size_kb = statement_features(statement)
+    params = model.get(kind, model['other'])
+    return params['base'] + params['per_column'] * columns + params['per_kb'] * size_kb
+
+def fit_cost_model(timing_log, model=DEFAULT_COST_MODEL):
+    """
+    Re-fit the cost model from a JSONL timing log of earlier runs.
+    Each record needs 'kind', 'columns', 'bytes' and 'duration' (seconds).
+    Kinds with fewer than MIN_SAMPLES timings keep their current parameters.
+    """
+    samples = {}
+    with open(timing_log, 'r') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if record.get('duration') is None:
+                continue
+            samples.setdefault(record['kind'], []).append(
+                (record.get('columns', 0), record.get('bytes', 0) / 1024, record['duration'])
+            )
+
+    fitted = {kind: dict(params) for kind, params in model.items()}
+    for kind, rows in samples.items():
+        if len(rows) < MIN_SAMPLES:
+            continue
+        data = np.array(rows, dtype=float)
+        features = np.column_stack([np.ones(len(data)), data[:, 0], data[:, 1]])
+        coefficients = np.linalg.lstsq(features, data[:, 2], rcond=None)[0]
+        base, per_column, per_kb = np.clip(coefficients, 0, None)
+        fitted[kind] = {'base': float(base), 'per_column': float(per_column), 'per_kb': float(per_kb)}
+    return fitted
+
+def balance_chunks(costs, num_chunks):
+    """
+    Bin-pack statements into num_chunks chunks of roughly equal total cost
+    (longest processing time first). Returns the chunk index of every statement.
+    """
+    chunks = [(0.0, chunk) for chunk in range(num_chunks)]
+    assignment = [0] * len(costs)
+    for position in sorted(range(len(costs)), key=lambda p: costs[p], reverse=True):
+        load, chunk = heapq.heappop(chunks)
+        assignment[position] = chunk
+        heapq.heappush(chunks, (load + costs[position], chunk))
+    return assignment
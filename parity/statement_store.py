@@ -0,0 +1,57 @@
+import csv
+import mmap
+import os
+
+from sql_statements import statement_kind
+
+# Files written into the split output directory
+STORE_FILE = 'statements.sql'
+MANIFEST_FILE = 'statements_manifest.csv'
+
+def write_store(assigned, output_dir):
+    """
+    Write (chunk id, statement) pairs into one statement store plus a manifest
+    of (offset, length, chunk, kind) rows. Offsets and lengths are in bytes and
+    exclude the ';\\n' terminator, so the store stays a runnable SQL file.
+    Returns (statement count, chunk count).
+    """
+    count = 0
+    chunks = set()
+    offset = 0
+    with open(os.path.join(output_dir, STORE_FILE), 'wb') as store, \
+         open(os.path.join(output_dir, MANIFEST_FILE), 'w', newline='') as manifest_file:
+        manifest = csv.writer(manifest_file)
+        manifest.writerow(['offset', 'length', 'chunk', 'kind'])
+        for chunk, statement in assigned:
+            data = statement.encode('utf-8')
+            store.write(data + b';\n')
+            manifest.writerow([offset, len(data), chunk, statement_kind(statement)])
+            offset += len(data) + 2
+            count += 1
+            chunks.add(chunk)
+    return count, len(chunks)
+
+def read_manifest(input_dir):
+    """Return the manifest as a list of (offset, length, chunk, kind) tuples"""
+    with open(os.path.join(input_dir, MANIFEST_FILE), 'r', newline='') as manifest_file:
+        reader = csv.reader(manifest_file)
+        next(reader, None)
+        return [(int(offset), int(length), int(chunk), kind) for offset, length, chunk, kind in reader]
+
+def iter_store_chunks(input_dir):
+    """
+    Yield (chunk id, statements) in chunk order. Statements are sliced straight
+    out of a memory-mapped view of the store using the manifest offsets, so
+    nothing is re-tokenized. Each chunk's statements must be consumed before the next chunk.
+    """
+    by_chunk = {}
+    for offset, length, chunk, _ in read_manifest(input_dir):
+        by_chunk.setdefault(chunk, []).append((offset, length))
+
+    store_path = os.path.join(input_dir, STORE_FILE)
+    if os.path.getsize(store_path) == 0:
+        return
+
+    with open(store_path, 'rb') as store, mmap.mmap(store.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        for chunk in sorted(by_chunk):
+            yield chunk, (view[offset:offset + length].decode('utf-8') for offset, length in by_chunk[chunk])
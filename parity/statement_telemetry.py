@@ -0,0 +1,109 @@
+import csv
+import json
+import os
+import sys
+import threading
+from datetime import datetime, timezone
+
+import numpy as np
+
+from statement_cost import statement_features
+from sql_statements import statement_target
+
+# Per-statement timings, appended across runs. JSONL by default (the format
+# statement_cost.fit_cost_model reads), CSV if the file name ends in .csv
+TELEMETRY_FILE = 'statement_timings.jsonl'
+FIELDS = ['start', 'duration', 'kind', 'target', 'columns', 'bytes', 'rows', 'query_id', 'error_code', 'batch']
+FLUSH_EVERY = 100   # Records buffered before they are appended to disk
+SLOWEST_OBJECTS = 20  # Objects listed in the summary
+
+def statement_record(statement, start, duration, rows=None, query_id=None, error_code=None, batch=None):
+    """Build the telemetry record for one executed statement"""
+    kind, columns, _ = statement_features(statement)
+    schema, name = statement_target(statement)
+    target = '.'.join(part for part in (schema, name) if part) or None
+    return {
+        'start': datetime.fromtimestamp(start, timezone.utc).isoformat(timespec='milliseconds'),
+        'duration': round(duration, 6),
+        'kind': kind,
+        'target': target,
+        'columns': columns,
+        'bytes': len(statement.encode('utf-8')),
+        'rows': rows,
+        'query_id': query_id,
+        'error_code': error_code,
+        'batch': batch,
+    }
+
+class TelemetryLog:
+    """Thread-safe, buffered writer of statement records"""
+
+    def __init__(self, path=TELEMETRY_FILE):
+        self.path = path
+        self.csv = path.endswith('.csv')
+        new_file = not os.path.exists(path) or os.path.getsize(path) == 0
+        self.file = open(path, 'a', newline='' if self.csv else None)
+        if self.csv:
+            self.writer = csv.DictWriter(self.file, fieldnames=FIELDS)
+            if new_file:
+                self.writer.writeheader()
+        self.buffer = []
+        self.lock = threading.Lock()
+
+    def record(self, record):
+        with self.lock:
+            self.buffer.append(record)
+            if len(self.buffer) >= FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self):
+        if self.csv:
+            self.writer.writerows(self.buffer)
+        else:
+            self.file.writelines(json.dumps(record) + '\n' for record in self.buffer)
+        self.file.flush()
+        self.buffer = []
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.file.close()
+
+def read_records(path=TELEMETRY_FILE):
+    """Yield the records of a JSONL or CSV telemetry file"""
+    with open(path, 'r', newline='') as f:
+        if path.endswith('.csv'):
+            for record in csv.DictReader(f):
+                record['duration'] = float(record['duration'])
+                yield record
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+def summarize(path=TELEMETRY_FILE):
+    """Print p50/p95/p99 latency per statement kind and the slowest objects"""
+    durations = {}
+    errors = {}
+    by_target = {}
+    for record in read_records(path):
+        kind = record['kind']
+        durations.setdefault(kind, []).append(record['duration'])
+        if record.get('error_code') not in (None, ''):
+            errors[kind] = errors.get(kind, 0) + 1
+        if record.get('target'):
+            total, count = by_target.get(record['target'], (0.0, 0))
+            by_target[record['target']] = (total + record['duration'], count + 1)
+
+    print(f"{'kind':<26}{'count':>8}{'errors':>8}{'p50 s':>10}{'p95 s':>10}{'p99 s':>10}{'total s':>12}")
+    for kind, values in sorted(durations.items(), key=lambda item: -sum(item[1])):
+        p50, p95, p99 = np.percentile(values, [50, 95, 99])
+        print(f"{kind:<26}{len(values):>8}{errors.get(kind, 0):>8}{p50:>10.3f}{p95:>10.3f}{p99:>10.3f}{sum(values):>12.1f}")
+
+    print("\nSlowest objects (total time across statements):")
+    slowest = sorted(by_target.items(), key=lambda item: -item[1][0])[:SLOWEST_OBJECTS]
+    for target, (total, count) in slowest:
+        print(f"{total:>10.3f}s  {count:>4} statements  {target}")
+
+if __name__ == "__main__":
+    summarize(sys.argv[1] if len(sys.argv) > 1 else TELEMETRY_FILE)
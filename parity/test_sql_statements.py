@@ -0,0 +1,21 @@
+import io
+
+from sql_statements import column_count, iter_statements, statement_kind, terminated
+
+def test_create_or_replace_external_table_kind():
+    statement = "CREATE OR REPLACE EXTERNAL TABLE S1.EXT (C0 VARCHAR AS (VALUE:c0::VARCHAR)) LOCATION = @stage"
+    assert statement_kind(statement) == 'create_external_table'
+
+def test_create_or_replace_secure_materialized_view_kind():
+    statement = "CREATE OR REPLACE SECURE MATERIALIZED VIEW S1.MV AS SELECT C0 FROM S1.T0"
+    assert statement_kind(statement) == 'create_materialized_view'
+
+def test_column_count_skips_commas_in_strings():
+    assert column_count("ALTER TABLE S1.T0 ADD COLUMN A VARCHAR DEFAULT 'x,y'") == 1
+    assert column_count("ALTER TABLE S1.T0 ADD COLUMN A NUMBER(38,0), B VARCHAR COMMENT 'a, (b'") == 2
+    assert column_count("CREATE TABLE S1.T0 (A VARCHAR DEFAULT 'x,y', \"B,C\" INT)") == 2
+
+def test_terminated_keeps_semicolon_out_of_trailing_comment():
+    statements = ["CREATE TABLE S1.T0 (A INT) -- note", "CREATE TABLE S1.T1 (B INT)"]
+    text = ''.join(terminated(statement) for statement in statements)
+    assert list(iter_statements(io.StringIO(text))) == statements
@@ -0,0 +1,59 @@
+import csv
+import os
+
+import pandas as pd
+
+from transfer_output import BUNDLE_DIR, INDEX_FILE, TransferWriter
+from transfer_plan import plan_transfers
+
+def desired_owners(owners, schema='S1'):
+    return pd.DataFrame({
+        'schema_name': [schema] * len(owners),
+        'table_name': [f"T{i}" for i in range(len(owners))],
+        'owner': owners,
+    })
+
+def test_majority_bulk_grant_with_overrides():
+    plan = plan_transfers(desired_owners(['R1', 'R1', 'R2', 'R1', 'R1']))
+    assert plan.bulk[['schema_name', 'owner']].astype(str).values.tolist() == [['S1', 'R1']]
+    assert plan.bulk['override_count'].tolist() == [1]
+    assert plan.overrides[['table_name', 'owner']].astype(str).values.tolist() == [['T2', 'R2']]
+    assert plan.individual.empty
+    assert plan.statement_count() == 2
+
+def test_per_table_grants_when_overrides_cost_more():
+    desired = desired_owners(['R1', 'R1', 'R1', 'R2', 'R2'])
+    # Only T0 changes owner: one table grant beats a bulk grant plus two overrides
+    current = desired.rename(columns={'owner': 'current_owner'})
+    current.loc[0, 'current_owner'] = 'R3'
+    plan = plan_transfers(desired, current)
+    assert plan.bulk.empty
+    assert plan.overrides.empty
+    assert plan.individual[['table_name', 'owner']].astype(str).values.tolist() == [['T0', 'R1']]
+
+def test_invalid_role_exception_blocks_bulk_grant():
+    plan = plan_transfers(desired_owners(['R1', 'R1', 'R1', 'R1', 'BAD']), valid_roles={'R1'})
+    # A bulk grant would leave T4 with R1, since its override can't run
+    assert plan.bulk.empty
+    assert plan.individual['table_name'].tolist() == ['T0', 'T1', 'T2', 'T3']
+    assert plan.skipped[['table_name', 'reason']].values.tolist() == [['T4', 'invalid role']]
+
+def test_bundle_rollover_keeps_overrides_with_bulk_grant(tmp_path):
+    writer = TransferWriter(str(tmp_path), max_bytes=100)
+    bulk_sql = "GRANT OWNERSHIP ON ALL TABLES IN SCHEMA {} TO ROLE R1 COPY CURRENT GRANTS;\n"
+    for schema_grant in ('first', 'second'):
+        writer.write('bulk', 'S1', None, bulk_sql.format('S1'), None)
+        for i in range(5):
+            writer.write('bulk', 'S1', f"{schema_grant}_T{i}",
+                         f"GRANT OWNERSHIP ON TABLE S1.{schema_grant}_T{i} TO ROLE R2 COPY CURRENT GRANTS;\n", None)
+    _, files = writer.close()
+
+    with open(os.path.join(tmp_path, INDEX_FILE), newline='') as f:
+        index = list(csv.DictReader(f))
+    # Each bulk grant and its overrides share one bundle, past max_bytes; the next bulk grant rolls over
+    assert [row['bundle'] for row in index if row['object'] == ''] == ['bulk_S1_0001.sql', 'bulk_S1_0002.sql']
+    assert {row['bundle'] for row in index if row['object'].startswith('first_')} == {'bulk_S1_0001.sql'}
+    assert {row['bundle'] for row in index if row['object'].startswith('second_')} == {'bulk_S1_0002.sql'}
+    assert files == 2
+    with open(os.path.join(tmp_path, BUNDLE_DIR, 'bulk_S1_0002.sql')) as f:
+        assert f.read().startswith("GRANT OWNERSHIP ON ALL TABLES IN SCHEMA S1")
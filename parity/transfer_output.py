@@ -0,0 +1,85 @@
+import csv
+import os
+import re
+
+BUNDLE_DIR = 'bundles'
+INDEX_FILE = 'bundle_index.csv'
+BUNDLE_MAX_BYTES = 1024 * 1024        # A bundle rolls over to the next file past this size
+BUFFER_MAX_BYTES = 16 * 1024 * 1024   # Buffered SQL is flushed to the bundles past this size
+
+def clean_name(name):
+    """Sanitize names for safe filename use"""
+    return re.sub(r'[^a-zA-Z0-9_]', '_', str(name))
+
+class TransferWriter:
+    """
+    Write ownership transfer SQL for many objects. By default the SQL is buffered
+    and written to a few size-bounded bundle files per kind and schema
+    (bundles/<kind>_<schema>_0001.sql, ...), plus an index of which bundle holds
+    which object. With legacy=True every object gets its own file, as before.
+    """
+
+    def __init__(self, output_dir, legacy=False, max_bytes=BUNDLE_MAX_BYTES):
+        self.output_dir = output_dir
+        self.legacy = legacy
+        self.max_bytes = max_bytes
+        self.bundle_dir = os.path.join(output_dir, BUNDLE_DIR)
+        self.bundles = {}     # (kind, schema) -> (bundle number, bytes assigned, holds a schema-wide statement)
+        self.buffers = {}     # bundle file -> SQL waiting to be written
+        self.buffered = 0
+        self.started = set()  # Bundle (or legacy) files written this run; the first write truncates
+        self.objects = 0
+        if not legacy:
+            os.makedirs(self.bundle_dir, exist_ok=True)
+            self.index_file = open(os.path.join(output_dir, INDEX_FILE), 'w', newline='')
+            self.index = csv.writer(self.index_file)
+            self.index.writerow(['kind', 'schema', 'object', 'bundle'])
+
+    def write(self, kind, schema, name, sql, legacy_path):
+        """
+        Add the SQL for one object: `kind` is e.g. 'bulk' or 'individual', `name` is
+        the table, or None for schema-wide statements. `legacy_path` is the file the
+        SQL goes to in legacy mode. SQL written with the same kind and schema, or
+        the same legacy path, keeps its order. A bundle only rolls over to the next
+        file before a schema-wide statement, or when it holds none: per-table SQL after
+        a schema-wide statement (e.g. overrides after a bulk grant) has to run after
+        it, so it stays in its file even past max_bytes.
+        """
+        self.objects += 1
+        if self.legacy:
+            with open(legacy_path, 'a' if legacy_path in self.started else 'w') as f:
+                f.write(sql)
+            self.started.add(legacy_path)
+            return
+
+        sql += '\n'  # Blank line between objects
+        size = len(sql.encode('utf-8'))
+        number, used, schema_wide = self.bundles.get((kind, schema), (1, 0, False))
+        if used and used + size > self.max_bytes and (name is None or not schema_wide):
+            number, used, schema_wide = number + 1, 0, False
+        self.bundles[(kind, schema)] = (number, used + size, schema_wide or name is None)
+
+        bundle = f"{kind}_{clean_name(schema)}_{number:04d}.sql"
+        self.buffers.setdefault(bundle, []).append(sql)
+        self.index.writerow([kind, schema, '' if name is None else name, bundle])
+        self.buffered += size
+        if self.buffered >= BUFFER_MAX_BYTES:
+            self.flush()
+
+    def flush(self):
+        """Write buffered SQL to its bundles, one open per bundle"""
+        for bundle, pieces in self.buffers.items():
+            mode = 'a' if bundle in self.started else 'w'
+            with open(os.path.join(self.bundle_dir, bundle), mode) as f:
+                f.writelines(pieces)
+            self.started.add(bundle)
+        self.buffers = {}
+        self.buffered = 0
+
+    def close(self):
+        """Flush everything and return (objects written, files written)"""
+        if self.legacy:
+            return self.objects, len(self.started)
+        self.flush()
+        self.index_file.close()
+        return self.objects, len(self.started)
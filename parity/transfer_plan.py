@@ -0,0 +1,134 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+PLAN_KEYS = ['schema_name', 'table_name']
+
+class TransferPlan:
+    """
+    Ownership transfers to generate, as DataFrames:
+      bulk        schema_name, owner, table_count, changed_count, override_count
+                  -> GRANT OWNERSHIP ON ALL TABLES IN SCHEMA
+      overrides   schema_name, table_name, owner, current_owner
+                  -> GRANT OWNERSHIP ON TABLE, run after the schema's bulk grant
+      individual  schema_name, table_name, owner, current_owner
+                  -> GRANT OWNERSHIP ON TABLE, in schemas without a bulk grant
+      skipped     schema_name, table_name, owner, reason
+    Schema and owner names are categoricals, so plans over millions of tables stay small.
+    """
+
+    def __init__(self, bulk, overrides, individual, skipped):
+        self.bulk = bulk
+        self.overrides = overrides
+        self.individual = individual
+        self.skipped = skipped
+
+    def statement_count(self):
+        return len(self.bulk) + len(self.overrides) + len(self.individual)
+
+    def bulk_groups(self):
+        """Yield (bulk row, its override rows) per bulk schema; overrides must run after the bulk grant"""
+        overrides = dict(tuple(self.overrides.groupby('schema_name', observed=True, sort=False)))
+        for row in self.bulk.itertuples(index=False):
+            group = overrides.get(row.schema_name)
+            yield row, (group.itertuples(index=False) if group is not None else ())
+
+def plan_transfers(desired, current=None, valid_roles=None, valid_tables=None, overrides=True):
+    """
+    Plan ownership transfers from `desired` (schema_name, table_name, owner).
+    With `current` (schema_name, table_name, current_owner), only tables present in
+    both are planned and tables that already have their desired owner are left out.
+
+    Each schema with changes gets whichever takes fewer statements: individual
+    grants for its changed tables, or one bulk grant to its most common (valid)
+    owner plus overrides for every table that should end up with someone else,
+    changed or not, since the bulk grant reassigns them all. A schema is only
+    bulk-granted when every override can run, so no table is left with the bulk
+    owner by mistake. overrides=False only bulk-grants schemas whose tables all
+    share one owner, as the generators used to.
+
+    Grants to roles not in `valid_roles`, and table grants on tables not in
+    `valid_tables` ('schema.table' names, as an Arrow string array or any
+    iterable), are skipped; None skips that check.
+    """
+    # Rows without a name or an owner can't be granted
+    plan = desired[['schema_name', 'table_name', 'owner']].dropna().reset_index(drop=True)
+    if current is not None:
+        # Only tables that exist in both
+        plan = pd.merge(plan, current[PLAN_KEYS + ['current_owner']], on=PLAN_KEYS, how='inner')
+        changed = (plan['owner'] != plan['current_owner']).to_numpy(dtype=bool, na_value=True)
+    else:
+        plan['current_owner'] = None
+        changed = np.ones(len(plan), dtype=bool)
+
+    schema_codes, schemas = pd.factorize(plan['schema_name'])
+    owner_codes, owners = pd.factorize(plan['owner'])
+    valid_owner = np.ones(len(owners), dtype=bool) if valid_roles is None else pd.Index(owners).isin(valid_roles)
+    role_ok = valid_owner[owner_codes]
+    table_ok = np.ones(len(plan), dtype=bool)
+    if valid_tables is not None:
+        # pyarrow's hash lookup; Series.isin() checks Arrow strings against a Python set one by one
+        names = pc.binary_join_element_wise(pa.array(plan['schema_name'].astype(str), pa.string()),
+                                            pa.array(plan['table_name'].astype(str), pa.string()), '.')
+        if not isinstance(valid_tables, pa.Array):
+            valid_tables = pa.array(list(valid_tables), pa.string())
+        found = pc.is_in(names, value_set=valid_tables)
+        table_ok = found.to_numpy(zero_copy_only=False)
+
+    # Most common valid owner of each schema (-1 when it has none)
+    pairs = pd.DataFrame({'schema': schema_codes, 'owner': owner_codes})[role_ok]
+    top = pairs.value_counts().reset_index().drop_duplicates('schema')
+    majority = np.full(len(schemas), -1)
+    majority[top['schema'].to_numpy()] = top['owner'].to_numpy()
+
+    def per_schema(mask):
+        return np.bincount(schema_codes, weights=mask, minlength=len(schemas)).astype('int64')
+
+    exception = owner_codes != majority[schema_codes]
+    table_count = per_schema(np.ones(len(plan)))
+    changed_count = per_schema(changed)
+    individual_cost = per_schema(changed & role_ok & table_ok)
+    override_count = per_schema(exception & table_ok)
+    # Tables missing from the target aren't touched by a bulk grant, so only bad roles block one
+    blocked = per_schema(exception & ~role_ok) > 0
+    # On a tie, only a bulk grant without overrides wins (it also reaches tables outside the plan)
+    use_bulk = (majority >= 0) & ~blocked & (individual_cost > 0) & \
+        ((override_count == 0) | (1 + override_count < individual_cost))
+    if not overrides:
+        use_bulk &= per_schema(exception) == 0
+    bulk_schemas = np.flatnonzero(use_bulk)
+    bulk = pd.DataFrame({
+        'schema_name': pd.Categorical.from_codes(bulk_schemas, schemas),
+        'owner': pd.Categorical.from_codes(majority[bulk_schemas], owners),
+        'table_count': table_count[bulk_schemas],
+        'changed_count': changed_count[bulk_schemas],
+        'override_count': override_count[bulk_schemas],
+    })
+
+    in_bulk = use_bulk[schema_codes]
+    override_rows = in_bulk & exception & table_ok
+    rows = ~in_bulk & changed & role_ok & table_ok
+    bad_role = ~in_bulk & changed & ~role_ok
+    bad_table = ((in_bulk & exception) | (~in_bulk & changed & role_ok)) & ~table_ok
+
+    plan = plan.assign(schema_name=pd.Categorical.from_codes(schema_codes, schemas),
+                       owner=pd.Categorical.from_codes(owner_codes, owners))
+    # Overrides grouped by schema in bulk order (bulk_schemas is sorted), input order within a schema
+    override_order = np.argsort(schema_codes[override_rows], kind='stable')
+    overrides_df = plan[override_rows].iloc[override_order].reset_index(drop=True)
+    individual = plan[rows].reset_index(drop=True)
+    skipped = pd.concat([
+        plan.loc[bad_role, ['schema_name', 'table_name', 'owner']].assign(reason='invalid role'),
+        plan.loc[bad_table, ['schema_name', 'table_name', 'owner']].assign(reason='table not found'),
+    ]).sort_index().reset_index(drop=True)
+
+    return TransferPlan(bulk, overrides_df, individual, skipped)
+
+def report_skipped(plan):
+    """Print one line per skipped table"""
+    for row in plan.skipped.itertuples(index=False):
+        if row.reason == 'invalid role':
+            print(f"Skipping {row.schema_name}.{row.table_name} - invalid role: {row.owner}")
+        else:
+            print(f"Skipping {row.schema_name}.{row.table_name} - {row.reason}")